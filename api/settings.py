@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 
 import os
+import sys
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -46,6 +47,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.routers.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -84,6 +86,99 @@ DATABASES = {
     }
 }
 
+# Read replicas of "default", comma separated hosts. Safe-method requests read
+# from them, see core/routers.py. A client that has just written reads from
+# the primary for REPLICA_PIN_SECONDS, long enough for the replicas to catch up.
+
+for number, host in enumerate(filter(None, os.getenv("DATABASE_REPLICA_HOSTS", "").split(","))):
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "TEST": {"MIRROR": "default"},
+    }
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias.startswith("replica_")]
+
+# Mirror of "default" the routing tests read from, see core/tests.py
+if sys.argv[1:2] == ["test"]:
+    DATABASES["test_replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", "5"))
+
+REPLICA_PIN_COOKIE = "rbui_primary_until"
+
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+
+# Caches
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+#
+# "platforms" holds rendered platform payloads and summaries in each worker.
+# "results" holds the same entries in a table of the main database, shared by
+# every worker and kept across deploys; create it with
+# `manage.py createcachetable`. Bump RESULT_CACHE_VERSION when a deploy changes
+# the shape of cached results.
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",},
+    "platforms": {
+        "BACKEND": os.getenv(
+            "PLATFORM_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("PLATFORM_CACHE_LOCATION", "platform_payloads"),
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("PLATFORM_CACHE_MAX_ENTRIES", 5000))},
+    },
+    "results": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "core_result_cache",
+        "TIMEOUT": int(os.getenv("RESULT_CACHE_TIMEOUT", 7 * 24 * 60 * 60)),
+        "VERSION": int(os.getenv("RESULT_CACHE_VERSION", 1)),
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 200000))},
+    },
+}
+
+PLATFORM_CACHE_ALIAS = "platforms"
+
+RESULT_CACHE_ALIAS = os.getenv("RESULT_CACHE_ALIAS", "results") or None
+
+# Version stamps read from RESULT_CACHE_ALIAS are kept per process for this
+# long, see core/versions.py. Other workers see a bump within that time.
+
+VERSION_CACHE_TIMEOUT = int(os.getenv("VERSION_CACHE_TIMEOUT", "5"))
+
+# Score columns of the whole fleet, memory-mapped by every worker on the host.
+# Rewritten by `manage.py refresh_fleet_scores`.
+
+FLEET_SCORES_PATH = os.getenv(
+    "FLEET_SCORES_PATH", os.path.join(BASE_DIR, "var", "fleet_scores.col")
+)
+
+# Versioned snapshots of every scoring input, for analytics and batch tools.
+# Written by `manage.py snapshot_inputs`.
+
+INPUT_SNAPSHOT_DIR = os.getenv(
+    "INPUT_SNAPSHOT_DIR", os.path.join(BASE_DIR, "var", "snapshots")
+)
+
+# Background jobs, run by `manage.py run_workers`. Files they read and write
+# go to JOB_OUTPUT_DIR, which must be shared with the web servers.
+
+JOB_OUTPUT_DIR = os.getenv("JOB_OUTPUT_DIR", os.path.join(BASE_DIR, "var", "jobs"))
+
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+
+JOB_RETRY_DELAY = int(os.getenv("JOB_RETRY_DELAY", "30"))
+
+# Running jobs that have not reported progress for this long are requeued
+JOB_LOCK_TIMEOUT = int(os.getenv("JOB_LOCK_TIMEOUT", "3600"))
+
+# Users of JWT requests are cached per process for AUTH_USER_CACHE_TIMEOUT
+# seconds, keyed by an auth version, see VERSION_CACHE_TIMEOUT.
+
+AUTH_USER_CACHE_TIMEOUT = float(os.getenv("AUTH_USER_CACHE_TIMEOUT", "30"))
+
+AUTH_USER_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_USER_CACHE_MAX_ENTRIES", "1000"))
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 
@@ -121,7 +216,7 @@ STATIC_ROOT = "static"
 REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": ["rest_framework.permissions.IsAuthenticated"],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "core.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
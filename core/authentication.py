@@ -0,0 +1,93 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DatabaseError
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .visibility import user_versions
+
+
+class UserCache:
+    """
+    Bounded, least recently used map of users with a time to live, shared by
+    the threads of a process.
+    """
+
+    def __init__(self, max_entries: int, timeout: float):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            user, expires = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return user
+
+    def set(self, key, user):
+        with self.lock:
+            self.entries[key] = (user, time.monotonic() + self.timeout)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == user_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_cache = UserCache(
+    max_entries=getattr(settings, "AUTH_USER_CACHE_MAX_ENTRIES", 1000),
+    timeout=getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 30),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` that remembers the user of a token for
+    ``AUTH_USER_CACHE_TIMEOUT`` seconds instead of loading it on every
+    request. Entries are keyed by the auth version of the user, which saving
+    or deleting the user bumps, see ``core.versions``: the change applies at
+    once in this process and within ``VERSION_CACHE_TIMEOUT`` seconds in the
+    others, without a query per request. ``QuerySet.update`` sends no
+    signals; callers changing users that way must call
+    ``core.visibility.bump_auth_versions``.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        try:
+            versions = user_versions(user_id)
+        except DatabaseError:
+            # Nothing cached can be trusted without the versions
+            return super().get_user(validated_token)
+
+        key = (user_id, validated_token.get(api_settings.JTI_CLAIM), versions.get("auth"))
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+
+        # Requests may set attributes on their user
+        user = copy.copy(user)
+        # Saves visible_ids reading it again
+        user.access_version = versions.get("access")
+        return user
@@ -0,0 +1,191 @@
+import base64
+import datetime
+import logging
+import pickle
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.db import DatabaseError, connections, router, transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .versions import reference_version
+
+logger = logging.getLogger("core.cache")
+
+# PlatformSerializer fields that depend on the requesting user. They are left
+# out of the cached payload and spliced back in per request.
+ACCESS_FIELDS = ("view_access", "modify_access")
+
+
+def render_payload(data: dict) -> bytes:
+    return JSONRenderer().render(
+        {key: value for key, value in data.items() if key not in ACCESS_FIELDS}
+    )
+
+
+def with_access(payload: bytes, view_access: bool, modify_access: bool) -> bytes:
+    prefix = JSONRenderer().render(
+        {"view_access": view_access, "modify_access": modify_access}
+    )
+    if payload == b"{}":
+        return prefix
+
+    return prefix[:-1] + b"," + payload[1:]
+
+
+# Entries per statement when writing to a DatabaseCache, three parameters each
+DATABASE_CACHE_BATCH_SIZE = 300
+
+
+def _database_cache_set_many(cache: DatabaseCache, entries: dict):
+    """
+    ``cache.set_many`` in three statements per batch instead of three per
+    entry: delete the keys, insert them in one multi-row insert and cull.
+    Rows are written the way ``DatabaseCache`` writes them.
+    """
+    db = router.db_for_write(cache.cache_model_class)
+    connection = connections[db]
+    quote_name = connection.ops.quote_name
+    table = quote_name(cache._table)
+
+    now = timezone.now().replace(microsecond=0)
+    timeout = cache.get_backend_timeout()
+    if timeout is None:
+        expires = datetime.datetime.max
+    elif settings.USE_TZ:
+        expires = datetime.datetime.utcfromtimestamp(timeout)
+    else:
+        expires = datetime.datetime.fromtimestamp(timeout)
+    expires = connection.ops.adapt_datetimefield_value(expires.replace(microsecond=0))
+
+    rows = []
+    for key, value in entries.items():
+        key = cache.make_key(key)
+        cache.validate_key(key)
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        rows.append((key, base64.b64encode(pickled).decode("latin1"), expires))
+
+    for start in range(0, len(rows), DATABASE_CACHE_BATCH_SIZE):
+        batch = rows[start : start + DATABASE_CACHE_BATCH_SIZE]
+        with transaction.atomic(using=db), connection.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM %s WHERE %s IN (%s)"
+                % (table, quote_name("cache_key"), ", ".join(["%s"] * len(batch))),
+                [row[0] for row in batch],
+            )
+            cursor.execute(
+                "INSERT INTO %s (%s, %s, %s) VALUES %s"
+                % (
+                    table,
+                    quote_name("cache_key"),
+                    quote_name("value"),
+                    quote_name("expires"),
+                    ", ".join(["(%s, %s, %s)"] * len(batch)),
+                ),
+                [param for row in batch for param in row],
+            )
+
+            cursor.execute("SELECT COUNT(*) FROM %s" % table)
+            if cursor.fetchone()[0] > cache._max_entries:
+                # Once per batch, as DatabaseCache culls before each entry
+                cache._cull(db, cursor, now)
+
+
+class VersionedResultCache:
+    """
+    Results computed for one platform, keyed by ``(pk, updated_at, version)``
+    so a write simply makes the old entry unreachable. The current year and
+    reference version are part of the key as well, because inspection plans
+    roll over with the year and scores change with the reference data.
+
+    Reads go to the per-process ``PLATFORM_CACHE_ALIAS`` cache first and then,
+    in one batched query, to the ``RESULT_CACHE_ALIAS`` cache shared by every
+    worker. Either alias may be set to ``None`` to skip that tier.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+        local_alias = getattr(settings, "PLATFORM_CACHE_ALIAS", "platforms")
+        shared_alias = getattr(settings, "RESULT_CACHE_ALIAS", None)
+        self.local = caches[local_alias] if local_alias else None
+        self.shared = caches[shared_alias] if shared_alias else None
+
+    def keys(self, rows) -> dict:
+        """
+        ``{key: row}`` of ``(pk, updated_at, version, ...)`` rows.
+
+        :raises DatabaseError: if the reference version cannot be read
+        """
+        prefix = f"{self.namespace}:{datetime.date.today().year}:{reference_version()}"
+        return {
+            f"{prefix}:{row[0]}:{row[2]}:{row[1].timestamp()}": row for row in rows
+        }
+
+    def get_many(self, versions) -> dict:
+        try:
+            keys = {key: row[0] for key, row in self.keys(versions).items()}
+        except DatabaseError:
+            logger.warning("reference version unavailable", exc_info=True)
+            return {}
+
+        found = self.local.get_many(keys) if self.local else {}
+
+        missing = [key for key in keys if key not in found]
+        if missing and self.shared:
+            try:
+                shared = self.shared.get_many(missing)
+            except DatabaseError:
+                logger.warning("shared result cache unavailable", exc_info=True)
+                shared = {}
+
+            if shared and self.local:
+                self.local.set_many(shared)
+            found.update(shared)
+
+        return {keys[key]: value for key, value in found.items()}
+
+    def set_many(self, results: dict):
+        """
+        :param results: ``{(pk, updated_at, version): value}``
+        """
+        if not results:
+            return
+
+        try:
+            entries = {key: results[row] for key, row in self.keys(results).items()}
+        except DatabaseError:
+            logger.warning("reference version unavailable", exc_info=True)
+            return
+
+        if self.local:
+            self.local.set_many(entries)
+
+        if self.shared:
+            try:
+                if isinstance(self.shared, DatabaseCache):
+                    _database_cache_set_many(self.shared, entries)
+                else:
+                    self.shared.set_many(entries)
+            except DatabaseError:
+                logger.warning("shared result cache unavailable", exc_info=True)
+
+
+class PlatformPayloadCache(VersionedResultCache):
+    """
+    Rendered ``PlatformSerializer`` output per platform.
+    """
+
+    def __init__(self):
+        super().__init__("platform-payload")
+
+
+class PlatformSummaryCache(VersionedResultCache):
+    """
+    ``PlatformSummaryCalculator`` rows per platform.
+    """
+
+    def __init__(self):
+        super().__init__("platform-summary")
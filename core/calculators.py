@@ -5,6 +5,7 @@ from dateutil.relativedelta import relativedelta
 from datetime import datetime, timedelta
 
 from core.models import Platform
+from core.registry import manned_status_ranking
 
 logger = logging.getLogger("core.calculators")
 
@@ -1281,9 +1282,8 @@ class FinalConsequenceCategoryCalculator:
         self.instance = instance
 
     def _calculate(self):
-        try:
-            clof_90 = self.instance.platform_manned_status.ranking
-        except:
+        clof_90 = manned_status_ranking(self.instance.platform_manned_status_id)
+        if clof_90 is None:
             return None
 
         clof_94 = self.instance.environmental_consequence_category
@@ -1314,9 +1314,8 @@ class ExposureCategoryLevelCalculator:
 
     def _calculate(self):
         clof_105 = FinalConsequenceCategoryCalculator(self.instance)._calculate()
-        try:
-            clof_90 = self.instance.platform_manned_status.ranking
-        except:
+        clof_90 = manned_status_ranking(self.instance.platform_manned_status_id)
+        if clof_90 is None:
             return None
         clof_108=None
         if clof_90 == 'E' or clof_90 == 'D':
@@ -1381,61 +1380,143 @@ class ExposureCategorySurveyLevel3Calculator:
             clof_109 = 'Detection of significant structural damage should form the basis for initiation of a Level III survey'
         return clof_109
 
-# class RiskRankingCalculator:
-#     instance: Platform
+class TotalScoreCalculator:
+    instance: Platform
 
-#     def __init__(self, instance: Platform):
-#         self.instance = instance
+    robustness_calculators = (
+        PlatformVintageScoreCalculator,
+        PlatformLegsAndBracingScoreCalculator,
+        LegPileGroutingScoreCalculator,
+        ShallowGasScoreCalculator,
+    )
+
+    condition_calculators = (
+        LastInspectionScoreCalculator,
+        MechanicalDamageScoreCalculator,
+        CorrosionScoreCalculator,
+        MarineGrowthScoreCalculator,
+        ScourCalculator,
+        FloodedMemberScoreCalculator,
+        UnprotectedAppurtenancesScoreCalculator,
+    )
+
+    loading_calculators = (
+        DeckLoadScoreCalculator,
+        DeckElevationWaveInDeckScoreCalculator,
+        AdditionalAppurtenanceScoreCalculator,
+        FatigueLoadScoreCalculator,
+    )
+
+    def __init__(self, instance: Platform):
+        self.instance = instance
+
+    def _calculate(self):
+        calculators = (
+            self.robustness_calculators
+            + self.condition_calculators
+            + self.loading_calculators
+        )
+        return (
+            sum(calculator(self.instance).calculate() for calculator in calculators)
+            + self.instance.rsr_override_score
+        )
+
+
+class LofRankingCalculator:
+    instance: Platform
+
+    def __init__(self, instance: Platform):
+        self.instance = instance
+
+    @staticmethod
+    def rank(score):
+        if score >= 680:
+            return 5
+        elif 490 <= score < 680:
+            return 4
+        elif 310 <= score < 490:
+            return 3
+        elif 120 <= score < 310:
+            return 2
+        else:
+            return 1
+
+    def _calculate(self):
+        return self.rank(TotalScoreCalculator(self.instance)._calculate())
+
+
+# clof_106, indexed by final consequence category (clof_105) then lof ranking (clof_88)
+RISK_MATRIX = {
+    "A": {1: "VL", 2: "VL", 3: "L", 4: "L", 5: "M"},
+    "B": {1: "VL", 2: "L", 3: "L", 4: "M", 5: "H"},
+    "C": {1: "L", 2: "L", 3: "M", 4: "H", 5: "H"},
+    "D": {1: "L", 2: "M", 3: "H", 4: "H", 5: "VH"},
+    "E": {1: "M", 2: "H", 3: "H", 4: "VH", 5: "VH"},
+}
+
+
+class RiskRankingCalculator:
+    instance: Platform
+
+    def __init__(self, instance: Platform):
+        self.instance = instance
+
+    @staticmethod
+    def rank(clof_88, clof_105):
+        return RISK_MATRIX.get(clof_105, {}).get(clof_88)
+
+    def _calculate(self):
+        clof_88 = LofRankingCalculator(self.instance)._calculate()
+        clof_105 = FinalConsequenceCategoryCalculator(self.instance)._calculate()
+        return self.rank(clof_88, clof_105)
+
+
+class NextInspectionYearCalculator:
+    instance: Platform
+
+    def __init__(self, instance: Platform):
+        self.instance = instance
+
+    def _calculate(self):
+        plan = Next10YearsInspectionPlanCalculator(self.instance)._calculate()
+        for entry in plan:
+            if entry["level"] not in ("", "No Inspection"):
+                return entry["year"]
+        return None
+
+
+class PlatformSummaryCalculator:
+    """
+    Headline figures for dashboards. Expects the instance to come from
+    ``Platform.objects.with_scoring_inputs()`` so that no calculator has to
+    go back to the database.
+    """
+
+    instance: Platform
+
+    def __init__(self, instance: Platform):
+        self.instance = instance
+
+    def _calculate(self):
+        lof_ranking = LofRankingCalculator(self.instance)._calculate()
+        final_consequence_category = FinalConsequenceCategoryCalculator(
+            self.instance
+        )._calculate()
+
+        return {
+            "id": self.instance.pk,
+            "name": self.instance.name,
+            "project": self.instance.project_id,
+            "risk_ranking": RiskRankingCalculator.rank(
+                lof_ranking, final_consequence_category
+            ),
+            "lof_ranking": lof_ranking,
+            "final_consequence_category": final_consequence_category,
+            "next_inspection_year": NextInspectionYearCalculator(
+                self.instance
+            )._calculate(),
+        }
 
-#     def _calculate(self):
-#         clof_88 = RiskBasedUnderwaterIntervalScoreCalculator(self.instance)._calculate()
-#         clof_105 = FinalConsequenceCategoryCalculator(self.instance)._calculate()
-
-#         if clof_105 == "A":
-#             if clof_88 == 1 or clof_88 == 2:
-#                 clof_106 = 'VL'
-#             elif clof_88 == 3 or clof_88 == 4:
-#                 clof_106 = 'L'
-#             elif clof_88 == 5:
-#                 clof_106 = 'M'
-        
-#         elif clof_105 == "B":
-#             if clof_88 == 1:
-#                 clof_106 = 'VL'
-#             elif clof_88 == 2 or clof_88 == 3:
-#                 clof_106 = 'L'
-#             elif clof_88 == 4:
-#                 clof_106 = 'M'
-#             elif clof_88 == 5:
-#                 clof_106 = 'H'
-        
-#         elif clof_105 == "C":
-#             if clof_88 == 1 or clof_88 == 2:
-#                 clof_106 = 'L'
-#             elif clof_88 == 3:
-#                 clof_106 = 'M'
-#             elif clof_88 == 4 or clof_88 == 5:
-#                 clof_106 = 'H'
-        
-#         elif clof_105 == "D":
-#             if clof_88 == 1:
-#                 clof_106 = 'L'
-#             elif clof_88 == 2:
-#                 clof_106 = 'M'
-#             elif clof_88 == 3 or clof_88 == 4:
-#                 clof_106 = 'H'
-#             elif clof_88 == 5:
-#                 clof_106 = 'VH'
-        
-#         elif clof_105 == "E":
-#             if clof_88 == 1:
-#                 clof_106 = 'M'
-#             elif clof_88 == 2 or clof_88 == 3:
-#                 clof_106 = 'H'
-#             elif clof_88 == 4 or clof_88 == 5:
-#                 clof_106 = 'VH'
-
-#         return clof_106
 
 # class RiskBasedUnderwaterIntervalScoreCalculator:
 #     instance: Platform
@@ -0,0 +1,139 @@
+"""
+A minimal memory-mapped columnar file format.
+
+Layout: an 8 byte magic, a little-endian uint32 header length, a JSON header
+describing each column, then the raw column buffers, each aligned to 8 bytes.
+Columns use ``array`` typecodes in the native byte order, so a reader gets
+them as zero-copy ``memoryview`` casts of the mapped file. Blobs are raw byte
+columns of any length, such as the UTF-8 text an offsets column points into.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+from typing import Dict, Sequence, Tuple
+
+MAGIC = b"RBUICOL1"
+ALIGNMENT = 8
+
+
+def _padding(offset: int) -> int:
+    return -offset % ALIGNMENT
+
+
+def write_columns(
+    path: str,
+    columns: Dict[str, Tuple[str, Sequence]],
+    meta: Dict = None,
+    blobs: Dict[str, bytes] = None,
+):
+    """
+    Atomically replace ``path`` with the given columns.
+
+    :param path: destination file
+    :param columns: ``{name: (typecode, values)}``, all of the same length
+    :param meta: JSON serializable metadata stored in the header
+    :param blobs: ``{name: bytes}`` of any length, read back as ``"B"`` columns
+    """
+    buffers = {name: array(typecode, values) for name, (typecode, values) in columns.items()}
+
+    lengths = {len(buffer) for buffer in buffers.values()}
+    if len(lengths) > 1:
+        raise ValueError("columns must all have the same length")
+
+    for name, data in (blobs or {}).items():
+        if name in buffers:
+            raise ValueError(f"{name} is both a column and a blob")
+        buffers[name] = array("B", data)
+
+    header = {
+        "meta": meta or {},
+        "length": lengths.pop() if lengths else 0,
+        "columns": {},
+    }
+
+    # Offsets are relative to the start of the data section, which itself
+    # starts on an aligned boundary after the header.
+    offset = 0
+    for name, buffer in buffers.items():
+        header["columns"][name] = {
+            "typecode": buffer.typecode,
+            "offset": offset,
+            "length": len(buffer),
+        }
+        offset += len(buffer) * buffer.itemsize
+        offset += _padding(offset)
+
+    header_bytes = json.dumps(header).encode()
+    preamble = MAGIC + struct.pack("<I", len(header_bytes)) + header_bytes
+    preamble += b"\0" * _padding(len(preamble))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(preamble)
+            for buffer in buffers.values():
+                data = buffer.tobytes()
+                file.write(data)
+                file.write(b"\0" * _padding(len(data)))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ColumnarFile:
+    """
+    Read-only view of a file written by ``write_columns``. Every process that
+    opens the same file shares one copy of it in the page cache.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        with open(path, "rb") as file:
+            self.stat = os.fstat(file.fileno())
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a columnar file")
+
+        header_length, = struct.unpack_from("<I", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 4
+        header = json.loads(self._mmap[header_start: header_start + header_length])
+
+        data_start = header_start + header_length
+        data_start += _padding(data_start)
+
+        self.meta = header["meta"]
+        self.length = header["length"]
+        self.columns = {}
+
+        self._view = view = memoryview(self._mmap)
+        for name, column in header["columns"].items():
+            itemsize = array(column["typecode"]).itemsize
+            start = data_start + column["offset"]
+            length = column.get("length", self.length)
+            self.columns[name] = view[start: start + length * itemsize].cast(
+                column["typecode"]
+            )
+
+    def __getitem__(self, name: str) -> memoryview:
+        return self.columns[name]
+
+    def __len__(self):
+        return self.length
+
+    def close(self):
+        for column in self.columns.values():
+            column.release()
+        self.columns = {}
+        self._view.release()
+        self._mmap.close()
@@ -0,0 +1,313 @@
+import bisect
+import datetime
+import logging
+import multiprocessing
+import os
+from typing import List, Optional, Tuple
+
+import pytz
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+
+from .calculators import (
+    TotalScoreCalculator,
+    LofRankingCalculator,
+    RiskRankingCalculator,
+    FinalConsequenceCategoryCalculator,
+    NextInspectionYearCalculator,
+)
+from .columnar import ColumnarFile, write_columns
+from .models import Platform, PlatformScore
+from .registry import get_reference_data
+from .versions import reference_version
+
+logger = logging.getLogger("core.fleet")
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=pytz.utc)
+
+# Small integer codes for the text columns, 0 meaning "no value"
+RISK_RANKINGS = (None, "VL", "L", "M", "H", "VH")
+CATEGORIES = (None, "A", "B", "C", "D", "E")
+
+FLEET_COLUMNS = {
+    "id": "q",
+    "project_id": "q",
+    "updated_at": "q",
+    "version": "q",
+    "total_score": "d",
+    "lof_ranking": "b",
+    "risk_ranking": "b",
+    "final_consequence_category": "b",
+    "next_inspection_year": "i",
+}
+
+
+def timestamp_us(value: datetime.datetime) -> int:
+    return (value - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def fleet_scores_path() -> str:
+    return settings.FLEET_SCORES_PATH
+
+
+def _code(values, value) -> int:
+    return values.index(value) if value in values else 0
+
+
+def score_platform(platform: Platform) -> dict:
+    """
+    The fields of ``PlatformScore``, for a platform from
+    ``Platform.objects.with_scoring_inputs()``.
+    """
+    total_score = TotalScoreCalculator(platform)._calculate()
+    lof_ranking = LofRankingCalculator.rank(total_score)
+    final_consequence_category = FinalConsequenceCategoryCalculator(platform)._calculate()
+
+    return {
+        "total_score": total_score,
+        "lof_ranking": lof_ranking,
+        "final_consequence_category": final_consequence_category,
+        "risk_ranking": RiskRankingCalculator.rank(lof_ranking, final_consequence_category),
+        "next_inspection_year": NextInspectionYearCalculator(platform)._calculate(),
+    }
+
+
+def refresh_fleet_scores(path: str = None) -> int:
+    """
+    Score the whole fleet and atomically replace the shared score file.
+    Meant to be run by a single refresher, see ``manage.py refresh_fleet_scores``.
+
+    :return: number of platforms written
+    """
+    reference_data = get_reference_data()
+    columns = {name: (typecode, []) for name, typecode in FLEET_COLUMNS.items()}
+
+    def append(name, value):
+        columns[name][1].append(value)
+
+    for platform in Platform.objects.with_scoring_inputs().chunked():
+        scores = score_platform(platform)
+
+        append("id", platform.pk)
+        append("project_id", platform.project_id)
+        append("updated_at", timestamp_us(platform.updated_at))
+        append("version", platform.version)
+        append("total_score", float(scores["total_score"]))
+        append("lof_ranking", scores["lof_ranking"])
+        append("risk_ranking", _code(RISK_RANKINGS, scores["risk_ranking"]))
+        append(
+            "final_consequence_category",
+            _code(CATEGORIES, scores["final_consequence_category"]),
+        )
+        append("next_inspection_year", scores["next_inspection_year"] or 0)
+
+    write_columns(
+        path or fleet_scores_path(),
+        columns,
+        meta={
+            "year": datetime.date.today().year,
+            "reference_version": reference_data.version,
+            "generated_at": timezone.now().isoformat(),
+        },
+    )
+    return len(columns["id"][1])
+
+
+class FleetScores:
+    """
+    Read-only, memory-mapped score columns of the whole fleet, ordered by
+    platform id.
+    """
+
+    def __init__(self, path: str):
+        self.file = ColumnarFile(path)
+
+    @property
+    def stat(self):
+        return self.file.stat
+
+    def current(self) -> bool:
+        """
+        Whether the file was scored this year from the current reference data.
+        """
+        if self.file.meta.get("year") != datetime.date.today().year:
+            return False
+
+        try:
+            return self.file.meta.get("reference_version") == reference_version()
+        except DatabaseError:
+            logger.warning("reference version unavailable", exc_info=True)
+            return False
+
+    def index(self, pk, updated_at, version) -> Optional[int]:
+        """
+        Row of platform ``pk``, or ``None`` if it is missing or was scored
+        from other inputs than ``(updated_at, version)``.
+        """
+        ids = self.file["id"]
+        i = bisect.bisect_left(ids, pk)
+        if i == len(ids) or ids[i] != pk:
+            return None
+
+        if (
+            self.file["updated_at"][i] != timestamp_us(updated_at)
+            or self.file["version"][i] != version
+        ):
+            return None
+
+        return i
+
+    def summaries(self, rows) -> dict:
+        """
+        ``PlatformSummaryCalculator`` shaped rows for every fresh platform.
+
+        :param rows: ``(pk, updated_at, version, name, project_id)`` tuples
+        :return: ``{pk: summary}``
+        """
+        if not self.current():
+            return {}
+
+        columns = self.file.columns
+        summaries = {}
+
+        for pk, updated_at, version, name, project_id in rows:
+            i = self.index(pk, updated_at, version)
+            if i is None:
+                continue
+
+            summaries[pk] = {
+                "id": pk,
+                "name": name,
+                "project": project_id,
+                "risk_ranking": RISK_RANKINGS[columns["risk_ranking"][i]],
+                "lof_ranking": columns["lof_ranking"][i],
+                "final_consequence_category": CATEGORIES[
+                    columns["final_consequence_category"][i]
+                ],
+                "next_inspection_year": columns["next_inspection_year"][i] or None,
+            }
+
+        return summaries
+
+
+_fleet_scores = None
+
+
+def get_fleet_scores() -> Optional[FleetScores]:
+    """
+    The current score file of this host, remapped whenever the refresher
+    has replaced it, or ``None`` if it has never been written.
+    """
+    global _fleet_scores
+
+    try:
+        stat = os.stat(fleet_scores_path())
+    except FileNotFoundError:
+        return None
+
+    fleet_scores = _fleet_scores
+    if (
+        fleet_scores is None
+        or fleet_scores.stat.st_ino != stat.st_ino
+        or fleet_scores.stat.st_mtime_ns != stat.st_mtime_ns
+    ):
+        try:
+            fleet_scores = FleetScores(fleet_scores_path())
+        except (OSError, ValueError):
+            logger.warning("could not map fleet scores", exc_info=True)
+            return None
+        _fleet_scores = fleet_scores
+
+    return fleet_scores
+
+
+def pk_ranges(queryset, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Split ``queryset`` into ``(first pk, last pk)`` ranges of ``chunk_size``
+    platforms each.
+    """
+    pks = list(queryset.order_by("pk").values_list("pk", flat=True))
+    return [
+        (pks[start], pks[min(start + chunk_size, len(pks)) - 1])
+        for start in range(0, len(pks), chunk_size)
+    ]
+
+
+def recompute_range(first_pk: int, last_pk: int, project_id: int = None) -> int:
+    """
+    Score platforms ``first_pk`` to ``last_pk`` and replace their stored
+    ``PlatformScore`` rows in bulk.
+
+    :return: number of platforms scored
+    """
+    queryset = Platform.objects.filter(pk__range=(first_pk, last_pk))
+    if project_id is not None:
+        queryset = queryset.filter(project_id=project_id)
+
+    year = datetime.date.today().year
+    reference_data = get_reference_data()
+    scores = [
+        PlatformScore(
+            platform_id=platform.pk,
+            year=year,
+            inputs_updated_at=platform.updated_at,
+            inputs_version=platform.version,
+            inputs_reference_version=reference_data.version,
+            **score_platform(platform),
+        )
+        for platform in queryset.with_scoring_inputs().order_by("pk")
+    ]
+
+    with transaction.atomic():
+        PlatformScore.objects.filter(platform_id__in=[score.pk for score in scores]).delete()
+        PlatformScore.objects.bulk_create(scores)
+
+    return len(scores)
+
+
+def _recompute_range_in_process(args) -> int:
+    try:
+        return recompute_range(*args)
+    finally:
+        connections.close_all()
+
+
+def _collect(counts, total: int, progress) -> int:
+    done = 0
+    for count in counts:
+        done += count
+        if progress is not None:
+            progress(done, total)
+    return done
+
+
+def recompute_scores(
+    project_id: int = None, workers: int = None, chunk_size: int = 500, progress=None
+) -> int:
+    """
+    Recompute the stored scores of every platform (of ``project_id``, if
+    given), one primary key range at a time in ``workers`` processes, each
+    with its own database connection.
+
+    :param progress: called with ``(done, total)`` platforms after every range
+    :return: number of platforms scored
+    """
+    queryset = Platform.objects.all()
+    if project_id is not None:
+        queryset = queryset.filter(project_id=project_id)
+
+    total = queryset.count()
+    tasks = [(first, last, project_id) for first, last in pk_ranges(queryset, chunk_size)]
+    workers = min(workers or os.cpu_count(), len(tasks))
+
+    if workers <= 1:
+        return _collect((recompute_range(*task) for task in tasks), total, progress)
+
+    # Forked processes must not share the parent's connection
+    connections.close_all()
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        # Leaving the block terminates the pool, also when a range failed
+        return _collect(
+            pool.imap_unordered(_recompute_range_in_process, tasks), total, progress
+        )
@@ -0,0 +1,210 @@
+"""
+Bulk import of inspection results from CSV.
+
+Every row names a platform in ``platform_id`` and may fill any of
+``<block>.<field>`` for the blocks in ``INSPECTION_BLOCKS`` (e.g.
+``corrosion.anode_survey_inspection_date``) and the platform's
+``level_1_last_inspection_date`` .. ``level_3_last_inspection_date``.
+Empty cells leave the current value alone.
+"""
+import csv
+import logging
+from itertools import islice
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Platform, PlatformOwnership
+from .serializers import (
+    LastInspectionSerializer,
+    MechanicalDamageSerializer,
+    CorrosionSerializer,
+    ScourSerializer,
+    FloodedMemberSerializer,
+    InspectionDatesSerializer,
+)
+
+logger = logging.getLogger("core.inspections")
+
+IMPORT_CHUNK_SIZE = 500
+
+INSPECTION_BLOCKS = {
+    "last_inspection": LastInspectionSerializer,
+    "mechanical_damage": MechanicalDamageSerializer,
+    "corrosion": CorrosionSerializer,
+    "scour": ScourSerializer,
+    "flooded_member": FloodedMemberSerializer,
+}
+
+
+def _check_corrosion(values: Dict) -> Optional[str]:
+    # Mirrors the anode_depletion_survey_performed constraint, so one bad row
+    # does not fail the bulk update of its whole chunk.
+    if (values["anode_survey_inspection_date"] is None) != (
+        values["average_anode_depletion_from_survey"] is None
+    ):
+        return (
+            "anode_survey_inspection_date and average_anode_depletion_from_survey "
+            "must be given together."
+        )
+    return None
+
+
+BLOCK_CHECKS = {"corrosion": _check_corrosion}
+
+
+class InspectionImport:
+    """
+    Validate and apply rows chunk by chunk. Each chunk is written with one
+    ``bulk_update`` per table, and rows with errors are skipped and reported
+    in ``errors`` without failing the rest.
+
+    :param user: only platforms this user may modify are updated, ``None``
+        for no restriction
+    """
+
+    def __init__(self, user=None, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.user = user
+        self.chunk_size = chunk_size
+        self.updated = 0
+        self.errors: List[Dict] = []
+        self.columns = {
+            "platform_id",
+            *InspectionDatesSerializer.Meta.fields,
+            *(
+                f"{name}.{field}"
+                for name, serializer_class in INSPECTION_BLOCKS.items()
+                for field, serializer_field in serializer_class().fields.items()
+                if not serializer_field.read_only
+            ),
+        }
+
+    def run(self, file) -> "InspectionImport":
+        """
+        :param file: text file object, read as a stream
+        """
+        rows = enumerate(csv.DictReader(file), start=2)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                self.errors.sort(key=lambda error: error["line"])
+                return self
+            self.import_chunk(chunk)
+
+    def error(self, line: int, platform_id, errors):
+        self.errors.append({"line": line, "platform_id": platform_id, "errors": errors})
+
+    def _platforms(self, ids: Iterable[int]) -> Dict[int, Platform]:
+        queryset = Platform.objects.filter(pk__in=ids).select_related(*INSPECTION_BLOCKS)
+
+        if self.user is not None and not self.user.is_superuser:
+            queryset = queryset.filter(
+                pk__in=PlatformOwnership.objects.filter(
+                    user=self.user, modify_access=True
+                ).values("platform_id")
+            )
+
+        return {platform.pk: platform for platform in queryset}
+
+    @transaction.atomic()
+    def import_chunk(self, chunk):
+        ids = {}
+        for line, row in chunk:
+            try:
+                ids[line] = int(row.get("platform_id"))
+            except (TypeError, ValueError):
+                self.error(line, row.get("platform_id"), {"platform_id": ["A valid integer is required."]})
+
+        platforms = self._platforms(ids.values())
+
+        changed_fields = {name: set() for name in INSPECTION_BLOCKS}
+        changed_objects = {name: {} for name in INSPECTION_BLOCKS}
+        changed_dates = set()
+        dated_platforms = {}
+
+        for line, row in chunk:
+            if line not in ids:
+                continue
+
+            platform = platforms.get(ids[line])
+            if platform is None:
+                self.error(line, ids[line], {"platform_id": ["Unknown platform or no modify access."]})
+                continue
+
+            cells = {key: value for key, value in row.items() if key and value not in (None, "")}
+            validated = {}
+            errors = {}
+
+            for name, serializer_class in INSPECTION_BLOCKS.items():
+                prefix = f"{name}."
+                data = {key[len(prefix):]: value for key, value in cells.items() if key.startswith(prefix)}
+                if not data:
+                    continue
+
+                serializer = serializer_class(data=data, partial=True)
+                if not serializer.is_valid():
+                    errors[name] = serializer.errors
+                    continue
+
+                check = BLOCK_CHECKS.get(name)
+                if check:
+                    child = getattr(platform, name)
+                    message = check({
+                        field.name: serializer.validated_data.get(field.name, getattr(child, field.attname))
+                        for field in child._meta.concrete_fields
+                    })
+                    if message:
+                        errors[name] = [message]
+                        continue
+
+                validated[name] = serializer.validated_data
+
+            dates = {key: value for key, value in cells.items() if key in InspectionDatesSerializer.Meta.fields}
+            if dates:
+                serializer = InspectionDatesSerializer(data=dates, partial=True)
+                if serializer.is_valid():
+                    validated["platform"] = serializer.validated_data
+                else:
+                    errors.update(serializer.errors)
+
+            unknown = set(cells) - self.columns
+            if unknown:
+                errors["unknown_columns"] = sorted(unknown)
+
+            if errors:
+                self.error(line, platform.pk, errors)
+                continue
+
+            for name, values in validated.items():
+                obj = platform if name == "platform" else getattr(platform, name)
+                for field, value in values.items():
+                    setattr(obj, field, value)
+
+                if name == "platform":
+                    changed_dates.update(values)
+                    dated_platforms[platform.pk] = platform
+                else:
+                    changed_fields[name].update(values)
+                    changed_objects[name][obj.pk] = obj
+
+            self.updated += 1
+
+        for name, objects in changed_objects.items():
+            if objects:
+                model = Platform._meta.get_field(name).related_model
+                model.objects.bulk_update(objects.values(), changed_fields[name])
+
+        if dated_platforms:
+            now = timezone.now()
+            for platform in dated_platforms.values():
+                platform.updated_at = now
+            Platform.objects.bulk_update(dated_platforms.values(), [*changed_dates, "updated_at"])
+
+        Platform.objects.filter(
+            pk__in={obj.platform_id for objects in changed_objects.values() for obj in objects.values()}
+        ).bump_version()
+
+
+def import_inspections(file, user=None, chunk_size: int = IMPORT_CHUNK_SIZE) -> InspectionImport:
+    return InspectionImport(user=user, chunk_size=chunk_size).run(file)
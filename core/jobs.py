@@ -0,0 +1,293 @@
+"""
+Background jobs stored in the ``Job`` table and run by ``manage.py run_workers``.
+
+Handlers are registered with ``@handler("kind")`` and called with the job and
+its payload. They report progress through ``Progress`` and return a JSON
+serializable result. A failing job is retried with exponential backoff until
+it has been attempted ``max_attempts`` times.
+"""
+import datetime
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+from types import SimpleNamespace
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from .calculators import PlatformSummaryCalculator
+from .fleet import recompute_scores, refresh_fleet_scores
+from .inspections import import_inspections
+from .models import Job, Platform, User
+from .serializers import PlatformSerializer
+from .snapshot import write_snapshot
+
+logger = logging.getLogger("core.jobs")
+
+HANDLERS: Dict[str, Callable] = {}
+
+# Kinds any user may enqueue through jobs/, the others need a superuser.
+# import_inspections is only enqueued by the upload endpoint.
+USER_KINDS = {"export_platforms", "scenario_sweep"}
+API_KINDS = USER_KINDS | {"refresh_fleet_scores", "recompute_scores", "snapshot_inputs"}
+
+
+def handler(kind: str):
+    def register(func: Callable) -> Callable:
+        HANDLERS[kind] = func
+        return func
+
+    return register
+
+
+def job_output_dir() -> str:
+    return settings.JOB_OUTPUT_DIR
+
+
+def enqueue(kind: str, payload: Dict = None, user=None, max_attempts: int = None) -> Job:
+    if kind not in HANDLERS:
+        raise ValueError(f"unknown job kind {kind}")
+
+    job = Job(kind=kind, payload=json.dumps(payload or {}, cls=JSONEncoder), created_by=user)
+    if max_attempts is not None:
+        job.max_attempts = max_attempts
+    job.save()
+    return job
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def lock_timeout() -> datetime.timedelta:
+    return datetime.timedelta(seconds=getattr(settings, "JOB_LOCK_TIMEOUT", 3600))
+
+
+@transaction.atomic()
+def claim(worker: str) -> Optional[Job]:
+    """
+    Lock the oldest runnable job for ``worker``. Rows locked by other workers
+    are skipped rather than waited for, so any number of workers can poll.
+    """
+    Job.objects.stale(lock_timeout()).update(status=Job.QUEUED, locked_by="", locked_at=None)
+
+    job = (
+        Job.objects.runnable()
+        .select_for_update(skip_locked=True)
+        .order_by("run_after", "pk")
+        .first()
+    )
+    if job is None:
+        return None
+
+    job.status = Job.RUNNING
+    job.attempts += 1
+    job.locked_by = worker
+    job.locked_at = timezone.now()
+    job.save(update_fields=["status", "attempts", "locked_by", "locked_at", "updated_at"])
+    return job
+
+
+class Progress:
+    """
+    Passed to handlers to report how far they are.
+    """
+
+    def __init__(self, job: Job):
+        self.job = job
+
+    def __call__(self, done: int, total: int, message: str = ""):
+        progress = min(100, done * 100 // total) if total else 100
+        Job.objects.filter(pk=self.job.pk, locked_by=self.job.locked_by).update(
+            progress=progress, progress_message=message[:250], locked_at=timezone.now()
+        )
+
+
+class Heartbeat(threading.Thread):
+    """
+    Refreshes the lock of a running job every third of ``JOB_LOCK_TIMEOUT``,
+    so jobs that report no progress for a while are not taken for stale and
+    handed to another worker.
+    """
+
+    def __init__(self, job: Job):
+        super().__init__(name=f"heartbeat-{job.pk}", daemon=True)
+        self.job = job
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(lock_timeout().total_seconds() / 3):
+                Job.objects.filter(pk=self.job.pk, locked_by=self.job.locked_by).update(
+                    locked_at=timezone.now()
+                )
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def _finish(job: Job, **fields) -> bool:
+    """
+    Record the outcome of ``job``, unless another worker has taken it over
+    in the meantime.
+    """
+    finished = Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(
+        locked_by="", locked_at=None, updated_at=timezone.now(), **fields
+    )
+    if not finished:
+        logger.warning("%s was taken over by another worker, dropping its outcome", job)
+    return bool(finished)
+
+
+def run(job: Job):
+    """
+    Run a claimed job and record its result, or schedule a retry.
+    """
+    logger.info("running %s", job)
+    heartbeat = Heartbeat(job)
+    heartbeat.start()
+    try:
+        result = HANDLERS[job.kind](job, job.payload_data, Progress(job))
+    except Exception:
+        heartbeat.stop()
+        error = traceback.format_exc()
+        logger.warning("%s failed", job, exc_info=True)
+
+        if job.attempts < job.max_attempts:
+            _finish(
+                job,
+                status=Job.QUEUED,
+                error=error,
+                run_after=timezone.now()
+                + datetime.timedelta(
+                    seconds=getattr(settings, "JOB_RETRY_DELAY", 30) * 2 ** (job.attempts - 1)
+                ),
+            )
+        else:
+            _finish(job, status=Job.FAILED, error=error, finished_at=timezone.now())
+        return
+
+    heartbeat.stop()
+    _finish(
+        job,
+        status=Job.DONE,
+        progress=100,
+        result=json.dumps(result, cls=JSONEncoder),
+        error="",
+        finished_at=timezone.now(),
+    )
+
+
+def run_next(worker: str) -> bool:
+    """
+    :return: whether a job was run
+    """
+    job = claim(worker)
+    if job is None:
+        return False
+
+    run(job)
+    return True
+
+
+def _owner_request(job: Job):
+    # PlatformSerializer reads the requesting user from its context
+    return SimpleNamespace(user=job.created_by or User(is_superuser=True))
+
+
+@handler("refresh_fleet_scores")
+def refresh_fleet_scores_job(job: Job, payload: Dict, progress: Progress):
+    return {"platforms": refresh_fleet_scores(payload.get("path"))}
+
+
+@handler("recompute_scores")
+def recompute_scores_job(job: Job, payload: Dict, progress: Progress):
+    return {
+        "platforms": recompute_scores(
+            payload.get("project"), payload.get("workers"), progress=progress
+        )
+    }
+
+
+@handler("snapshot_inputs")
+def snapshot_inputs_job(job: Job, payload: Dict, progress: Progress):
+    return {"path": write_snapshot(payload.get("directory"))}
+
+
+@handler("export_platforms")
+def export_platforms_job(job: Job, payload: Dict, progress: Progress):
+    """
+    Same NDJSON as ``platforms/export/``, written to a file under
+    ``JOB_OUTPUT_DIR``. The payload may narrow it to a ``project``.
+    """
+    request = _owner_request(job)
+    queryset = Platform.objects.has_ownership(request.user).with_scoring_inputs()
+    if payload.get("project"):
+        queryset = queryset.filter(project_id=payload["project"])
+
+    total = queryset.count()
+    os.makedirs(job_output_dir(), exist_ok=True)
+    path = os.path.join(job_output_dir(), f"export-{job.pk}.ndjson")
+
+    with open(path, "w") as file:
+        for done, platform in enumerate(queryset.chunked(), start=1):
+            data = PlatformSerializer(platform, context={"request": request}).data
+            file.write(json.dumps(data, cls=JSONEncoder) + "\n")
+            if done % 100 == 0:
+                progress(done, total, f"{done} of {total} platforms")
+
+    return {"path": path, "platforms": total}
+
+
+@handler("import_inspections")
+def import_inspections_job(job: Job, payload: Dict, progress: Progress):
+    """
+    Import a CSV saved under ``JOB_OUTPUT_DIR`` by the upload endpoint, then
+    delete it.
+    """
+    with open(payload["path"], newline="", encoding="utf-8-sig") as file:
+        result = import_inspections(file, user=job.created_by)
+    os.remove(payload["path"])
+
+    return {"updated": result.updated, "errors": result.errors}
+
+
+@handler("scenario_sweep")
+def scenario_sweep_job(job: Job, payload: Dict, progress: Progress):
+    """
+    Summaries of the visible platforms (of ``project``, if given) as if they
+    were assessed in each of ``years``.
+
+    :return: ``{platform id: {year: summary}}``
+    """
+    years = [int(year) for year in payload["years"]]
+    queryset = Platform.objects.has_ownership(_owner_request(job).user).with_scoring_inputs()
+    if payload.get("project"):
+        queryset = queryset.filter(project_id=payload["project"])
+
+    total = queryset.count()
+    results = {}
+    for done, platform in enumerate(queryset.chunked(), start=1):
+        assessment_date = platform.rbui_assessment_date
+        results[platform.pk] = {}
+        for year in years:
+            # Feb 29 falls back to Feb 28 in other years
+            platform.rbui_assessment_date = assessment_date.replace(
+                year=year, day=min(assessment_date.day, 28 if assessment_date.month == 2 else 31)
+            )
+            results[platform.pk][year] = PlatformSummaryCalculator(platform)._calculate()
+        platform.rbui_assessment_date = assessment_date
+
+        if done % 100 == 0:
+            progress(done, total, f"{done} of {total} platforms")
+
+    return results
@@ -0,0 +1,89 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import Platform, PlatformOwnership, Project, ProjectOwnership, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Time Platform.objects.visible_to against the join it replaced, on generated"
+        " ownerships that are rolled back afterwards"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ownerships", type=int, default=100_000, help="platform ownerships")
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--platforms", type=int, default=5000)
+        parser.add_argument("--repeat", type=int, default=20, help="runs of each query")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user = self.generate(options["users"], options["platforms"], options["ownerships"])
+
+            exists_count, exists_time = self.time(
+                Platform.objects.visible_to(user), options["repeat"]
+            )
+            join_count, join_time = self.time(
+                Platform.objects.filter(Q(users=user) | Q(project__users=user)).distinct(),
+                options["repeat"],
+            )
+            transaction.set_rollback(True)
+
+        if exists_count != join_count:
+            self.stderr.write(f"EXISTS found {exists_count} platforms, the join {join_count}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{options['ownerships']} ownerships: EXISTS {exists_time * 1000:.2f} ms,"
+                f" join + DISTINCT {join_time * 1000:.2f} ms"
+            )
+        )
+
+    def generate(self, users, platforms, ownerships) -> User:
+        # Ids are read back, not every backend returns them from bulk_create
+        prefix = "benchmark user "
+        User.objects.bulk_create(User(username=f"{prefix}{i}") for i in range(users))
+        user_ids = list(
+            User.objects.filter(username__startswith=prefix).order_by("pk").values_list("pk", flat=True)
+        )
+        Project.objects.bulk_create(Project(name=f"benchmark project {i}") for i in range(100))
+        project_ids = list(
+            Project.objects.filter(name__startswith="benchmark project ").values_list("pk", flat=True)
+        )
+        Platform.objects.bulk_create(
+            (
+                Platform(name=f"benchmark platform {i}", project_id=project_ids[i % len(project_ids)])
+                for i in range(platforms)
+            ),
+            batch_size=5000,
+        )
+        platform_ids = list(
+            Platform.objects.filter(name__startswith="benchmark platform ").values_list("pk", flat=True)
+        )
+
+        PlatformOwnership.objects.bulk_create(
+            (
+                PlatformOwnership(
+                    user_id=user_ids[i % len(user_ids)],
+                    platform_id=platform_ids[i // len(user_ids) % len(platform_ids)],
+                )
+                for i in range(ownerships - len(user_ids))
+            ),
+            batch_size=5000,
+            ignore_conflicts=True,
+        )
+        ProjectOwnership.objects.bulk_create(
+            ProjectOwnership(user_id=user, project_id=project_ids[i % len(project_ids)])
+            for i, user in enumerate(user_ids)
+        )
+        return User.objects.get(pk=user_ids[0])
+
+    @staticmethod
+    def time(queryset, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            count = len(queryset.values_list("pk", flat=True))
+        return count, (time.perf_counter() - start) / repeat
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.inspections import import_inspections, IMPORT_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = "Bulk update inspection results of many platforms from a CSV file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("file")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        with open(options["file"], newline="", encoding="utf-8-sig") as file:
+            result = import_inspections(file, chunk_size=options["chunk_size"])
+
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']} (platform {error['platform_id']}): {error['errors']}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated {result.updated} rows, {len(result.errors)} rows with errors")
+        )
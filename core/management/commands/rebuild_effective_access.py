@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.models import EffectiveAccess, Platform
+
+
+class Command(BaseCommand):
+    help = "Recompute the effective access of every platform from the ownerships"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="platforms per transaction")
+
+    def handle(self, *args, **options):
+        pks = list(Platform.objects.order_by("pk").values_list("pk", flat=True))
+        for start in range(0, len(pks), options["chunk_size"]):
+            EffectiveAccess.objects.refresh(pks[start : start + options["chunk_size"]])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt access of {len(pks)} platforms, {EffectiveAccess.objects.count()} rows"
+            )
+        )
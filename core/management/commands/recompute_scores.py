@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from core.fleet import recompute_scores
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored scores of every platform, in parallel processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--project", type=int, help="only the platforms of this project")
+        parser.add_argument(
+            "--workers", type=int, help="scoring processes, defaults to the number of CPUs"
+        )
+        parser.add_argument("--chunk-size", type=int, default=500, help="platforms per range")
+
+    def handle(self, *args, **options):
+        def progress(done, total):
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{done} of {total} platforms")
+
+        count = recompute_scores(
+            options["project"], options["workers"], options["chunk_size"], progress
+        )
+        self.stdout.write(self.style.SUCCESS(f"Recomputed scores of {count} platforms"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.fleet import refresh_fleet_scores, fleet_scores_path
+
+
+class Command(BaseCommand):
+    help = "Score every platform and rewrite the shared fleet score file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", help="defaults to settings.FLEET_SCORES_PATH")
+
+    def handle(self, *args, **options):
+        path = options["path"] or fleet_scores_path()
+        count = refresh_fleet_scores(path)
+        self.stdout.write(self.style.SUCCESS(f"Wrote scores of {count} platforms to {path}"))
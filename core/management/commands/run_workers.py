@@ -0,0 +1,67 @@
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from core.jobs import run_next, worker_name
+
+
+def work(poll_interval: float, once: bool):
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    worker = worker_name()
+    while not stopping:
+        close_old_connections()
+        if run_next(worker):
+            continue
+        if once:
+            return
+        time.sleep(poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the job table until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1, help="worker processes")
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=getattr(settings, "JOB_POLL_INTERVAL", 2),
+            help="seconds to wait when the queue is empty",
+        )
+        parser.add_argument("--once", action="store_true", help="exit once the queue is empty")
+
+    def handle(self, *args, **options):
+        if options["workers"] == 1:
+            work(options["poll_interval"], options["once"])
+            return
+
+        # Forked children must not share the parent's connection
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=work, args=(options["poll_interval"], options["once"]))
+            for _ in range(options["workers"])
+        ]
+        for process in processes:
+            process.start()
+
+        def stop(signum, frame):
+            # Workers finish their current job, then exit
+            for process in processes:
+                process.terminate()
+
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, stop)
+        for process in processes:
+            process.join()
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.snapshot import write_snapshot, snapshot_dir
+
+
+class Command(BaseCommand):
+    help = "Write a memory-mapped snapshot of every scoring input and make it the latest"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dir", help="defaults to settings.INPUT_SNAPSHOT_DIR")
+
+    def handle(self, *args, **options):
+        path = write_snapshot(options["dir"] or snapshot_dir())
+        self.stdout.write(self.style.SUCCESS(f"Wrote input snapshot {path}"))
@@ -1,5 +1,7 @@
 from .general import *
+from .job import *
 from .ownership import *
 from .platform import *
 from .project import *
+from .score import *
 from .site import *
@@ -0,0 +1,81 @@
+import datetime
+import json
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class JobQuerySet(models.QuerySet):
+    def has_ownership(self, user: settings.AUTH_USER_MODEL):
+        if user.is_superuser:
+            return self
+
+        return self.filter(Q(created_by=user))
+
+    def runnable(self):
+        return self.filter(status=Job.QUEUED, run_after__lte=timezone.now())
+
+    def stale(self, timeout: datetime.timedelta):
+        """
+        Running jobs whose worker has not reported back within ``timeout``,
+        e.g. because it was killed.
+        """
+        return self.filter(status=Job.RUNNING, locked_at__lt=timezone.now() - timeout)
+
+
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    Status = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=50)
+
+    # JSON, see payload_data / result_data
+    payload = models.TextField(default="{}", blank=True)
+    result = models.TextField(default="", blank=True)
+
+    status = models.CharField(max_length=10, choices=Status, default=QUEUED)
+
+    progress = models.PositiveSmallIntegerField(default=0, verbose_name="progress (%)")
+    progress_message = models.CharField(max_length=250, default="", blank=True)
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    error = models.TextField(default="", blank=True)
+
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, default="", blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"], name="job_runnable")]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def payload_data(self):
+        return json.loads(self.payload or "{}")
+
+    @property
+    def result_data(self):
+        return json.loads(self.result) if self.result else None
@@ -1,5 +1,6 @@
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.dispatch import Signal
 
 
 class PlatformOwnership(models.Model):
@@ -81,3 +82,96 @@ class ProjectOwnership(models.Model):
 #                 fields=["user", "site"], name="unique_site_ownership"
 #             )
 #         ]
+
+
+# Sent with the ``user_ids`` whose effective access was refreshed, once the
+# change is committed
+access_changed = Signal()
+
+
+class EffectiveAccessQuerySet(models.QuerySet):
+    def refresh(self, platform_ids, user_ids=None):
+        """
+        Recompute the rows of platforms ``platform_ids`` (ids or a ``values``
+        queryset), of ``user_ids`` only if given, from the platform and
+        project ownerships.
+        """
+        Platform = self.model.platform.field.related_model
+
+        platform_projects = dict(
+            Platform.objects.using(self.db).filter(pk__in=platform_ids).values_list("pk", "project_id")
+        )
+        project_platforms = {}
+        for platform_id, project_id in platform_projects.items():
+            project_platforms.setdefault(project_id, []).append(platform_id)
+
+        platform_ownerships = PlatformOwnership.objects.using(self.db).filter(
+            platform_id__in=list(platform_projects)
+        )
+        project_ownerships = ProjectOwnership.objects.using(self.db).filter(
+            project_id__in=list(project_platforms)
+        )
+        rows = self.filter(platform_id__in=platform_ids)
+        if user_ids is not None:
+            platform_ownerships = platform_ownerships.filter(user_id__in=user_ids)
+            project_ownerships = project_ownerships.filter(user_id__in=user_ids)
+            rows = rows.filter(user_id__in=user_ids)
+
+        fields = ("user_id", "view_access", "modify_access", "delete_access")
+        access = {}
+
+        def grant(user_id, platform_id, *flags):
+            current = access.get((user_id, platform_id), (False, False, False))
+            access[user_id, platform_id] = tuple(a or b for a, b in zip(current, flags))
+
+        for platform_id, *values in platform_ownerships.values_list("platform_id", *fields):
+            grant(values[0], platform_id, *values[1:])
+        for project_id, *values in project_ownerships.values_list("project_id", *fields):
+            for platform_id in project_platforms[project_id]:
+                grant(values[0], platform_id, *values[1:])
+
+        with transaction.atomic(using=self.db):
+            changed = set(user_ids or ()) | {user_id for user_id, _ in access}
+            changed.update(rows.values_list("user_id", flat=True))
+            rows.delete()
+            self.bulk_create(
+                EffectiveAccess(
+                    user_id=user_id,
+                    platform_id=platform_id,
+                    view_access=view_access,
+                    modify_access=modify_access,
+                    delete_access=delete_access,
+                )
+                for (user_id, platform_id), (view_access, modify_access, delete_access) in access.items()
+            )
+            transaction.on_commit(
+                lambda: access_changed.send(sender=EffectiveAccess, user_ids=changed), using=self.db
+            )
+
+
+class EffectiveAccess(models.Model):
+    """
+    One row per platform a user can see, directly or through its project,
+    with the combined access of both ownerships. Maintained by the signals in
+    ``core.signals``, rebuilt by ``manage.py rebuild_effective_access``.
+    """
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    platform = models.ForeignKey("Platform", on_delete=models.CASCADE, related_name="+")
+
+    view_access = models.BooleanField(default=False)
+    modify_access = models.BooleanField(default=False)
+    delete_access = models.BooleanField(default=False)
+
+    objects = EffectiveAccessQuerySet.as_manager()
+
+    def __str__(self):
+        return f"User {self.user_id} access to Platform {self.platform_id}"
+
+    class Meta:
+        constraints = [
+            # Also the index visibility filters look up (user_id, platform_id) in
+            models.UniqueConstraint(
+                fields=["user", "platform"], name="unique_effective_access"
+            )
+        ]
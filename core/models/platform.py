@@ -5,14 +5,14 @@ from decimal import Decimal
 import pytz
 from django.conf import settings
 from django.core.validators import MinValueValidator
-from django.db import models, transaction
-from django.db.models import Q, Subquery, OuterRef, CheckConstraint
+from django.db import models, transaction, connections
+from django.db.models import F, Q, Exists, Subquery, OuterRef, CheckConstraint
 from django.db.models.functions import Coalesce
 from django.utils import timezone
 from .project import Project
 
 from . import NumberOfLegsType, BracingType, PlatformMannedStatus, PlatformType
-from .ownership import PlatformOwnership, ProjectOwnership
+from .ownership import EffectiveAccess, PlatformOwnership, ProjectOwnership
 
 DATE_1969 = datetime.datetime(year=1969, month=1, day=1, tzinfo=pytz.utc)
 
@@ -151,10 +151,22 @@ class MarineGrowthQuerySet(models.QuerySet):
         if user.is_superuser:
             return self
 
+        return self.filter(platform_id__in=EffectiveAccess.objects.filter(user=user).values("platform_id"))
+
+    def visible_to(self, user: settings.AUTH_USER_MODEL):
+        """
+        Same rows as ``has_ownership``, computed from the ownerships with
+        ``EXISTS`` subqueries instead of the effective access table.
+        """
+        if user.is_superuser:
+            return self
+
         return self.filter(
-            Q(platform__users=user)
-            | Q(platform__project__users=user)
-        ).distinct()
+            Exists(PlatformOwnership.objects.filter(user=user, platform=OuterRef("platform_id")))
+            | Exists(
+                ProjectOwnership.objects.filter(user=user, project=OuterRef("platform__project_id"))
+            )
+        )
 
 
 class MarineGrowth(models.Model):
@@ -180,6 +192,17 @@ class MarineGrowth(models.Model):
 
     objects = MarineGrowthQuerySet.as_manager()
 
+    def save(self, **kwargs):
+        result = super().save(**kwargs)
+        Platform.objects.filter(pk=self.platform_id).bump_version()
+        return result
+
+    def delete(self, **kwargs):
+        platform_id = self.platform_id
+        result = super().delete(**kwargs)
+        Platform.objects.filter(pk=platform_id).bump_version()
+        return result
+
 
 class Scour(models.Model):
     design_scour_depth = models.DecimalField(
@@ -648,6 +671,28 @@ class ScopeOfSurvey(models.Model):
     weld_scope = models.CharField(max_length=100, null=True,blank=True)
 
 
+SCORING_RELATED_FIELDS = (
+    "leg_pile_grouting",
+    "shallow_gas",
+    "last_inspection",
+    "mechanical_damage",
+    "corrosion",
+    "scour",
+    "flooded_member",
+    "unprotected_appurtenances",
+    "deck_load",
+    "deck_elevation_wave_in_deck",
+    "additional_appurtenance",
+    "fatigue_load",
+    "reserve_strength_ratio_score",
+    "environmental_consequence",
+    "economic_impact_consequence",
+)
+
+# Every one-to-one child created along with a platform
+CHILD_RELATED_FIELDS = SCORING_RELATED_FIELDS + ("scope_of_survey", "other_detail")
+
+
 class PlatformQuerySet(models.QuerySet):
     # def with_access_type(self, user: settings.AUTH_USER_MODEL):
     #     platform_ownership = PlatformOwnership.objects.filter(
@@ -671,9 +716,93 @@ class PlatformQuerySet(models.QuerySet):
         if user.is_superuser:
             return self
 
+        return self.filter(pk__in=EffectiveAccess.objects.filter(user=user).values("platform_id"))
+
+    def visible_to(self, user: settings.AUTH_USER_MODEL):
+        """
+        Same rows as ``has_ownership``, computed from the ownerships with
+        ``EXISTS`` subqueries, which use their ``(user, platform)`` and
+        ``(user, project)`` unique indexes and need no ``DISTINCT``, instead
+        of the effective access table.
+        """
+        if user.is_superuser:
+            return self
+
         return self.filter(
-            Q(users=user) | Q(project__users=user)
-        ).distinct()
+            Exists(PlatformOwnership.objects.filter(user=user, platform=OuterRef("pk")))
+            | Exists(ProjectOwnership.objects.filter(user=user, project=OuterRef("project_id")))
+        )
+
+    def with_scoring_inputs(self):
+        """
+        Load every input the calculators read in a single joined query, plus
+        one query for the marine growths, instead of one query per child
+        table per platform.
+        """
+        return self.select_related(*SCORING_RELATED_FIELDS).prefetch_related(
+            "marine_growths"
+        )
+
+    def bump_version(self):
+        """
+        Mark the inputs of the selected platforms as changed, e.g. after a
+        write to a child table that does not go through ``Platform.save()``.
+        """
+        return self.update(version=F("version") + 1)
+
+    @transaction.atomic()
+    def bulk_create_with_children(self, platforms, children=None, batch_size=None):
+        """
+        Insert new platforms and all their child rows with one ``bulk_create``
+        per table, instead of the 18 queries per platform of ``Platform.save()``.
+
+        :param platforms: unsaved platforms
+        :param children: optional ``{related_name: {field: value}}`` per
+            platform, with the inputs of its child rows. Children without
+            inputs are created with their defaults.
+        :return: the saved platforms
+        """
+        platforms = list(platforms)
+        children = children or [{}] * len(platforms)
+
+        if connections[self.db].features.can_return_rows_from_bulk_insert:
+            platforms = self.bulk_create(platforms, batch_size=batch_size)
+        else:
+            # The children need the new primary keys, which this database
+            # does not return from a bulk insert.
+            for platform in platforms:
+                models.Model.save(platform, using=self.db)
+
+        for related_name in CHILD_RELATED_FIELDS:
+            model = self.model._meta.get_field(related_name).related_model
+            model.objects.using(self.db).bulk_create(
+                [
+                    model(platform=platform, **inputs.get(related_name, {}))
+                    for platform, inputs in zip(platforms, children)
+                ],
+                batch_size=batch_size,
+            )
+
+        return platforms
+
+    def chunked(self, chunk_size: int = 500):
+        """
+        Yield platforms ordered by primary key, fetching ``chunk_size`` rows
+        (and their prefetches) at a time so memory stays flat for any fleet
+        size. ``QuerySet.iterator()`` would silently drop the prefetches.
+        """
+        last_pk = None
+        while True:
+            queryset = self.order_by("pk")
+            if last_pk is not None:
+                queryset = queryset.filter(pk__gt=last_pk)
+
+            chunk = list(queryset[:chunk_size])
+            if not chunk:
+                return
+
+            yield from chunk
+            last_pk = chunk[-1].pk
 
 
 class Platform(models.Model):
@@ -778,11 +907,15 @@ class Platform(models.Model):
     level_2_last_inspection_date = models.DateField(null=True,blank=True)
     level_3_last_inspection_date = models.DateField(null=True,blank=True)
 
+    version = models.PositiveIntegerField(
+        default=0, verbose_name="version of the child inputs and marine growths"
+    )
+
     @property
     def framing_score(self):
         return Decimal(
-            NUMBER_OF_LEGS_AND_BRACING_METRICS[self.bracing_type.pk - 1][
-                self.number_of_legs_type.pk - 1
+            NUMBER_OF_LEGS_AND_BRACING_METRICS[self.bracing_type_id - 1][
+                self.number_of_legs_type_id - 1
                 ]
         )
 
@@ -1,6 +1,9 @@
 from django.conf import settings
 from django.db import models
-from django.db.models import Q
+from django.db.models import Count, Exists, Max, Min, OuterRef, Q
+
+from .ownership import ProjectOwnership
+from .score import RISK_RANKING_LEVELS, fresh_score_q
 
 
 class ProjectQuerySet(models.QuerySet):
@@ -11,9 +14,40 @@ class ProjectQuerySet(models.QuerySet):
         # return self.filter(
         #     Q(users=user) | Q(project_platform__users=user)
         # ).distinct()
+        return self.visible_to(user)
+
+    def visible_to(self, user: settings.AUTH_USER_MODEL):
+        """
+        Projects ``user`` owns, as an ``EXISTS`` subquery on the ownerships
+        rather than a join that needs ``DISTINCT``.
+        """
+        if user.is_superuser:
+            return self
+
         return self.filter(
-            Q(users=user) 
-        ).distinct()
+            Exists(ProjectOwnership.objects.filter(user=user, project=OuterRef("pk")))
+        )
+
+    def with_platform_stats(self):
+        """
+        Annotate the platform count and, over the platforms with fresh stored
+        scores, the count per risk ranking, the worst lof ranking and the
+        next inspection year, in the same grouped query.
+        """
+        fresh = fresh_score_q("project_platform__")
+        return self.annotate(
+            platform_count=Count("project_platform"),
+            scored_platform_count=Count("project_platform", filter=fresh),
+            worst_lof_ranking=Max("project_platform__score__lof_ranking", filter=fresh),
+            next_inspection_year=Min("project_platform__score__next_inspection_year", filter=fresh),
+            **{
+                f"risk_ranking_{ranking}": Count(
+                    "project_platform",
+                    filter=fresh & Q(project_platform__score__risk_ranking=ranking),
+                )
+                for ranking in RISK_RANKING_LEVELS
+            },
+        )
 
 
 class Project(models.Model):
@@ -0,0 +1,67 @@
+import datetime
+
+from django.db import models
+from django.db.models import F, Q
+
+from ..versions import reference_version
+
+RISK_RANKING_LEVELS = ("VL", "L", "M", "H", "VH")
+
+
+def fresh_score_q(prefix: str = "") -> Q:
+    """
+    ``PlatformScoreQuerySet.fresh`` as a condition on the platform at
+    ``prefix``, e.g. ``project_platform__`` from a project.
+    """
+    return Q(
+        **{
+            f"{prefix}score__year": datetime.date.today().year,
+            f"{prefix}score__inputs_updated_at": F(f"{prefix}updated_at"),
+            f"{prefix}score__inputs_version": F(f"{prefix}version"),
+            f"{prefix}score__inputs_reference_version": reference_version(),
+        }
+    )
+
+
+class PlatformScoreQuerySet(models.QuerySet):
+    def fresh(self):
+        """
+        Scores computed this year from the current inputs of their platform
+        and the current reference data.
+        """
+        return self.filter(
+            year=datetime.date.today().year,
+            inputs_updated_at=F("platform__updated_at"),
+            inputs_version=F("platform__version"),
+            inputs_reference_version=reference_version(),
+        )
+
+
+class PlatformScore(models.Model):
+    """
+    Headline scores of a platform as of ``scored_at``, written in bulk by
+    ``manage.py recompute_scores``.
+    """
+
+    platform = models.OneToOneField(
+        "Platform", on_delete=models.CASCADE, primary_key=True, related_name="score"
+    )
+
+    total_score = models.DecimalField(max_digits=12, decimal_places=4)
+    lof_ranking = models.PositiveSmallIntegerField()
+    final_consequence_category = models.CharField(max_length=1, null=True, blank=True)
+    risk_ranking = models.CharField(max_length=2, null=True, blank=True)
+    next_inspection_year = models.PositiveIntegerField(null=True, blank=True)
+
+    # Inputs the scores were computed from, see PlatformScoreQuerySet.fresh
+    year = models.PositiveIntegerField()
+    inputs_updated_at = models.DateTimeField()
+    inputs_version = models.PositiveIntegerField()
+    inputs_reference_version = models.BigIntegerField(default=0)
+
+    scored_at = models.DateTimeField(auto_now=True)
+
+    objects = PlatformScoreQuerySet.as_manager()
+
+    def __str__(self):
+        return f"Scores of platform {self.platform_id}"
@@ -0,0 +1,191 @@
+import codecs
+import json
+import re
+from itertools import islice
+from typing import Iterable, Iterator, List
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+READ_SIZE = 64 * 1024
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def _parse_constant(value):
+    raise ValueError(f"{value} is not valid JSON")
+
+
+_decoder = json.JSONDecoder(parse_constant=_parse_constant)
+
+
+def _record(value):
+    if not isinstance(value, dict):
+        raise ParseError("Every record must be a JSON object.")
+    return value
+
+
+def iter_ndjson(stream, encoding: str, max_record_size: int = None) -> Iterator[dict]:
+    """
+    One record per line, blank lines are skipped. A line longer than
+    ``max_record_size`` bytes raises ``ParseError``.
+    """
+    number = 0
+    while True:
+        # Two more bytes for the line ending
+        line = stream.readline(max_record_size + 2) if max_record_size else stream.readline()
+        if not line:
+            return
+
+        number += 1
+        if max_record_size and len(line.rstrip(b"\r\n")) > max_record_size:
+            raise ParseError(
+                f"NDJSON parse error on line {number} - longer than {max_record_size} bytes."
+            )
+
+        line = line.decode(encoding).strip()
+        if not line:
+            continue
+
+        try:
+            yield _record(_decoder.decode(line))
+        except ValueError as exc:
+            raise ParseError(f"NDJSON parse error on line {number} - {exc}")
+
+
+def iter_json_array(stream, encoding: str, max_record_size: int = None) -> Iterator[dict]:
+    """
+    Records of a top level JSON array, decoded one at a time so only the
+    record being read is held in memory. A record still incomplete after
+    ``max_record_size`` characters raises ``ParseError``.
+    """
+    decode = codecs.getincrementaldecoder(encoding)().decode
+    # Parsing goes on from ``pos``, the text before it is dropped on reads
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read() -> str:
+        nonlocal buffer, pos, eof
+        data = stream.read(READ_SIZE)
+        eof = not data
+        text = decode(data, final=eof)
+        buffer = buffer[pos:] + text
+        pos = 0
+        return text
+
+    def read_record():
+        # An unfinished record can only be completed by a closing brace, so
+        # it is not decoded again before one is read.
+        while True:
+            if max_record_size and len(buffer) - pos > max_record_size:
+                raise ParseError(
+                    f"JSON parse error - record longer than {max_record_size} characters."
+                )
+            if "}" in read() or eof:
+                return
+
+    def next_token() -> str:
+        nonlocal pos
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                return buffer[pos : pos + 1]
+            read()
+
+    def end_of_array():
+        # Only whitespace may follow the closing bracket
+        nonlocal pos
+        pos += 1
+        if next_token():
+            raise ParseError("JSON parse error - unexpected data after the top level array.")
+
+    if next_token() != "[":
+        raise ParseError("JSON parse error - expected a top level array.")
+    pos += 1
+
+    if next_token() == "]":
+        end_of_array()
+        return
+
+    while True:
+        token = next_token()
+        if not token:
+            raise ParseError("JSON parse error - unexpected end of data.")
+        if token != "{":
+            raise ParseError("Every record must be a JSON object.")
+
+        while True:
+            try:
+                value, end = _decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise ParseError(f"JSON parse error - {exc}")
+                read_record()
+            except ValueError as exc:
+                raise ParseError(f"JSON parse error - {exc}")
+
+        yield value
+        pos = end
+
+        token = next_token()
+        if token == "]":
+            end_of_array()
+            return
+        if token != ",":
+            raise ParseError("JSON parse error - expected ',' or ']' after a record.")
+        pos += 1
+
+
+class RecordStream:
+    """
+    The records of a request body, parsed lazily as they are iterated, so
+    bulk endpoints can validate and save them in bounded batches. Can only
+    be iterated once.
+    """
+
+    def __init__(self, records: Iterator[dict]):
+        self.records = records
+
+    def __iter__(self):
+        return self.records
+
+
+def batched(records: Iterable, size: int) -> Iterator[List]:
+    records = iter(records)
+    while True:
+        batch = list(islice(records, size))
+        if not batch:
+            return
+        yield batch
+
+
+class NDJSONRecordParser(BaseParser):
+    """
+    Streams newline-delimited JSON records, each at most
+    ``DATA_UPLOAD_MAX_MEMORY_SIZE`` bytes.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        return RecordStream(iter_ndjson(stream, encoding, settings.DATA_UPLOAD_MAX_MEMORY_SIZE))
+
+
+class JSONRecordsParser(BaseParser):
+    """
+    Streams the records of a JSON array, for payloads too large for
+    ``JSONParser``. Each record may take up to
+    ``DATA_UPLOAD_MAX_MEMORY_SIZE`` characters.
+    """
+
+    media_type = "application/vnd.rbui.records+json"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        return RecordStream(iter_json_array(stream, encoding, settings.DATA_UPLOAD_MAX_MEMORY_SIZE))
@@ -0,0 +1,41 @@
+"""
+Batched loading of scoring inputs for the heavy read endpoints.
+"""
+from collections import defaultdict
+from typing import List
+
+from .models import Platform, MarineGrowth, SCORING_RELATED_FIELDS
+
+
+def attach_prefetched(instance, related_name: str, objects: List):
+    """
+    Make ``objects`` the prefetched result of ``instance.<related_name>``, as
+    ``prefetch_related`` would.
+    """
+    queryset = getattr(instance, related_name).all()
+    queryset._result_cache = objects
+    queryset._prefetch_done = True
+
+    if not hasattr(instance, "_prefetched_objects_cache"):
+        instance._prefetched_objects_cache = {}
+    instance._prefetched_objects_cache[related_name] = queryset
+
+
+def fetch_platforms(pks, related=()) -> List[Platform]:
+    """
+    Platforms ``pks`` with every scoring input, in two queries: the platform
+    rows with their one-to-one inputs and ``related``, then their marine
+    growths.
+    """
+    platforms = list(
+        Platform.objects.filter(pk__in=pks).select_related(*SCORING_RELATED_FIELDS, *related)
+    )
+
+    marine_growths = defaultdict(list)
+    for marine_growth in MarineGrowth.objects.filter(platform_id__in=pks).order_by("pk"):
+        marine_growths[marine_growth.platform_id].append(marine_growth)
+
+    for platform in platforms:
+        attach_prefetched(platform, "marine_growths", marine_growths.get(platform.pk, []))
+
+    return platforms
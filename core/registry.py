@@ -0,0 +1,137 @@
+import logging
+import math
+import threading
+import time
+from types import MappingProxyType
+from typing import NamedTuple, Mapping
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from .models import PlatformType, BracingType, NumberOfLegsType, PlatformMannedStatus
+from .versions import reference_version
+
+logger = logging.getLogger("core.registry")
+
+REFERENCE_MODELS = {
+    "platform_types": PlatformType,
+    "bracing_types": BracingType,
+    "number_of_legs_types": NumberOfLegsType,
+    "platform_manned_statuses": PlatformMannedStatus,
+}
+
+
+class ReferenceData(NamedTuple):
+    platform_types: Mapping[int, PlatformType]
+    bracing_types: Mapping[int, BracingType]
+    number_of_legs_types: Mapping[int, NumberOfLegsType]
+    platform_manned_statuses: Mapping[int, PlatformMannedStatus]
+    version: int
+    loaded_at: float
+
+
+_lock = threading.Lock()
+_reference_data = None
+
+
+def load() -> ReferenceData:
+    """
+    Read every reference table into a read-only snapshot, keyed by primary key
+    in primary key order, and make it the current one.
+    """
+    global _reference_data
+
+    # Read first, so the tables are at least as new as the version
+    version = reference_version()
+    tables = {
+        name: MappingProxyType({obj.pk: obj for obj in model.objects.order_by("pk")})
+        for name, model in REFERENCE_MODELS.items()
+    }
+    reference_data = ReferenceData(**tables, version=version, loaded_at=time.monotonic())
+
+    with _lock:
+        _reference_data = reference_data
+
+    logger.debug("reference data loaded")
+    return reference_data
+
+
+def install(**tables) -> ReferenceData:
+    """
+    Make the given tables the current snapshot without reading the database,
+    e.g. for tools running from an input snapshot. Installed data does not
+    expire.
+    """
+    global _reference_data
+
+    reference_data = ReferenceData(
+        **{name: MappingProxyType(dict(tables[name])) for name in REFERENCE_MODELS},
+        version=None,
+        loaded_at=math.inf,
+    )
+
+    with _lock:
+        _reference_data = reference_data
+
+    return reference_data
+
+
+def invalidate():
+    global _reference_data
+
+    with _lock:
+        _reference_data = None
+
+
+def get_reference_data() -> ReferenceData:
+    """
+    Current snapshot, reloaded once the shared reference version has been
+    bumped by an edit in any worker. Snapshots also expire after
+    ``REFERENCE_DATA_TTL`` seconds to pick up changes made outside of Django.
+    """
+    reference_data = _reference_data
+    if reference_data is not None and reference_data.loaded_at == math.inf:
+        return reference_data
+
+    ttl = getattr(settings, "REFERENCE_DATA_TTL", 300)
+    if reference_data is None or time.monotonic() - reference_data.loaded_at > ttl:
+        return load()
+
+    try:
+        if reference_data.version != reference_version():
+            reference_data = load()
+    except DatabaseError:
+        logger.warning("reference version unavailable", exc_info=True)
+
+    return reference_data
+
+
+def lookup(name: str, pk):
+    """
+    Reference row by primary key, or ``None``. A miss reloads the snapshot
+    once in case the row was added by another worker.
+    """
+    if pk is None:
+        return None
+
+    obj = getattr(get_reference_data(), name).get(pk)
+    if obj is None:
+        obj = getattr(load(), name).get(pk)
+
+    return obj
+
+
+def manned_status_ranking(pk):
+    platform_manned_status = lookup("platform_manned_statuses", pk)
+    if platform_manned_status is None:
+        return None
+
+    return platform_manned_status.ranking
+
+
+def try_load():
+    try:
+        load()
+    except DatabaseError:
+        # Tables do not exist yet, e.g. before the first migrate.
+        logger.info("reference data not loaded, will retry on first use")
@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+
+
+def _flatten(data: dict, prefix: str = ""):
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+def _encode(value):
+    if isinstance(value, Decimal):
+        return float(value)
+
+    if isinstance(value, list) and value and isinstance(value[0], dict):
+        return to_columnar(value)
+
+    return value
+
+
+def to_columnar(rows: list) -> dict:
+    """
+    Turn a list of (possibly nested) dicts into a header of dotted field
+    names followed by one array of values per row.
+    """
+    flat_rows = [dict(_flatten(row)) for row in rows]
+
+    columns = {}
+    for flat_row in flat_rows:
+        columns.update(dict.fromkeys(flat_row))
+    columns = list(columns)
+
+    return {
+        "columns": columns,
+        "rows": [
+            [_encode(flat_row.get(column)) for column in columns]
+            for flat_row in flat_rows
+        ],
+    }
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    Compact representation for large list responses, selected with
+    ``?format=columnar``. Anything that is not a list (errors, single
+    objects) is rendered as plain JSON.
+    """
+
+    media_type = "application/vnd.rbui.columnar+json"
+    format = "columnar"
+    compact = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, list):
+            data = to_columnar(data)
+
+        return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,36 @@
+import hashlib
+from typing import NamedTuple
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from rest_framework.renderers import JSONRenderer
+
+
+class Precompiled(NamedTuple):
+    content: bytes
+    etag: str
+
+
+def precompile(data) -> Precompiled:
+    """
+    Render ``data`` to JSON bytes once, together with a strong ETag of the
+    bytes, so it can be served over and over without serializing again.
+    """
+    content = JSONRenderer().render(data)
+    return Precompiled(content, quote_etag(hashlib.sha1(content).hexdigest()))
+
+
+def precompiled_response(request, precompiled: Precompiled) -> HttpResponse:
+    response = get_conditional_response(request, etag=precompiled.etag)
+    if response is None:
+        response = HttpResponse(precompiled.content, content_type="application/json")
+
+    response["ETag"] = precompiled.etag
+    patch_cache_control(
+        response,
+        private=True,
+        max_age=getattr(settings, "REFERENCE_DATA_MAX_AGE", 86400),
+    )
+    return response
@@ -0,0 +1,96 @@
+"""
+Read replica routing.
+
+``ReplicaRoutingMiddleware`` marks safe-method requests as replica reads.
+``ReplicaRouter`` then sends their reads to one of ``REPLICA_DATABASES``,
+and everything else, every write and all work outside of a request, to
+``default``.
+
+After a successful write the middleware sets the ``REPLICA_PIN_COOKIE`` for
+``REPLICA_PIN_SECONDS``, so the same client reads its own writes from the
+primary until the replicas have caught up.
+
+The flag is local to the request thread and its ``sync_to_async`` calls.
+Work handed to other threads must carry it over with
+``replica_reads(replica_reads_enabled())``.
+"""
+import random
+import time
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.conf import settings
+
+_state = Local()
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def replica_databases():
+    return getattr(settings, "REPLICA_DATABASES", [])
+
+
+def replica_reads_enabled() -> bool:
+    return getattr(_state, "replica_reads", False)
+
+
+@contextmanager
+def replica_reads(enabled: bool = True):
+    """
+    Route the reads of the block to the replicas.
+    """
+    previous = replica_reads_enabled()
+    _state.replica_reads = enabled
+    try:
+        yield
+    finally:
+        _state.replica_reads = previous
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = replica_databases()
+        if replicas and replica_reads_enabled():
+            return random.choice(replicas)
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        databases = {"default", *replica_databases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_databases()
+
+
+class ReplicaRoutingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def pinned(self, request) -> bool:
+        try:
+            return float(request.COOKIES.get(settings.REPLICA_PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def __call__(self, request):
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if response.status_code < 400 and replica_databases():
+                pin_seconds = settings.REPLICA_PIN_SECONDS
+                response.set_cookie(
+                    settings.REPLICA_PIN_COOKIE,
+                    str(time.time() + pin_seconds),
+                    max_age=pin_seconds,
+                    httponly=True,
+                    samesite="Lax",
+                )
+            return response
+
+        with replica_reads(not self.pinned(request)):
+            return self.get_response(request)
@@ -1,8 +1,9 @@
+import bisect
 import logging
-from functools import lru_cache
-from typing import Dict
+from functools import wraps
+from typing import Dict, List
 
-from django.db import transaction
+from django.db import models, transaction
 from rest_framework import serializers
 
 from .calculators import (
@@ -34,8 +35,12 @@ from .calculators import (
     Level2NextInspectionDateCalculator,
     Level3NextInspectionDateCalculator,
     Next10YearsInspectionPlanCalculator,
-    MarineGrowthEachElevationCalculator
+    MarineGrowthEachElevationCalculator,
+    LofRankingCalculator,
+    RiskRankingCalculator,
 )
+from .cache import ACCESS_FIELDS
+from .parsers import batched
 from .models import (
     User,
     Project,
@@ -64,11 +69,162 @@ from .models import (
     # SiteOwnership,
     PlatformOwnership,
     ScopeOfSurvey,
-    OtherDetail
+    OtherDetail,
+    Job,
+    CHILD_RELATED_FIELDS,
+    RISK_RANKING_LEVELS,
 )
 
 logger = logging.getLogger("core.serializers")
 
+FRAMING_INPUTS = {"bracing_type_id", "number_of_legs_type_id"}
+ECONOMIC_IMPACT_INPUTS = {
+    "corrosion",
+    "environmental_consequence",
+    "economic_impact_consequence",
+    "platform_installation_date",
+    "rbui_assessment_date",
+}
+CONSEQUENCE_CATEGORY_INPUTS = {
+    "environmental_consequence_category",
+    "economic_consequence_category",
+    "platform_manned_status_id",
+}
+INSPECTION_LEVEL_INPUTS = {
+    level: {
+        f"level_{level}_last_inspection_date",
+        f"level_{level}_selected_inspection_interval_for_next_inspection",
+    }
+    for level in (1, 2, 3)
+}
+
+# Platform fields and child blocks read by each score component of
+# PlatformSerializer, used to report what an update affected. Keep in step
+# with the calculators, ``ScoreComponentInputsTest`` changes every input to
+# check it.
+SCORE_COMPONENT_INPUTS = {
+    "platform_vintage_score": {"design_date", "platform_installation_date"},
+    "platform_legs_and_bracing_score": FRAMING_INPUTS,
+    "leg_pile_grouting_score": {"leg_pile_grouting", "design_date", "platform_installation_date"},
+    "shallow_gas_score": {"shallow_gas"},
+    "last_inspection_score": {"last_inspection", "platform_installation_date", "rbui_assessment_date", *FRAMING_INPUTS},
+    "mechanical_damage_score": {"mechanical_damage", *FRAMING_INPUTS},
+    "corrosion_score": {"corrosion", "platform_installation_date", "rbui_assessment_date"},
+    "marine_growths_score": {"marine_growths"},
+    "marine_growth_each_elevation": {"marine_growths", "reserve_strength_ratio_score"},
+    "scour_score": {"scour"},
+    "flooded_member_score": {"flooded_member", "rbui_assessment_date", *FRAMING_INPUTS},
+    "unprotected_appurtenances_score": {"unprotected_appurtenances"},
+    "deck_load_score": {"deck_load", "platform_installation_date", "rbui_assessment_date"},
+    "deck_elevation_wave_in_deck_score": {"deck_elevation_wave_in_deck", *FRAMING_INPUTS},
+    "additional_appurtenance_score": {"additional_appurtenance"},
+    "fatigue_load_score": {"fatigue_load", "design_date", "platform_installation_date"},
+    "calculated_environmental_consequence": {"environmental_consequence"},
+    "calculated_economic_impact_consequence": ECONOMIC_IMPACT_INPUTS,
+    "calculate_economic_impact_remaining_life_services": ECONOMIC_IMPACT_INPUTS,
+    "structure_replacement_decision": ECONOMIC_IMPACT_INPUTS,
+    "final_consequence_category": CONSEQUENCE_CATEGORY_INPUTS,
+    "exposure_category_level": CONSEQUENCE_CATEGORY_INPUTS,
+    "exposure_category_level_1": CONSEQUENCE_CATEGORY_INPUTS,
+    "exposure_category_level_2": CONSEQUENCE_CATEGORY_INPUTS,
+    "exposure_category_level_3": CONSEQUENCE_CATEGORY_INPUTS,
+    "level_1_next_inspection_date": INSPECTION_LEVEL_INPUTS[1],
+    "level_2_next_inspection_date": INSPECTION_LEVEL_INPUTS[2],
+    "level_3_next_inspection_date": INSPECTION_LEVEL_INPUTS[3],
+    "next_10_years_inspection_plan": set().union(*INSPECTION_LEVEL_INPUTS.values()),
+}
+
+# Inputs no score component reads. Any other input missing from
+# SCORE_COMPONENT_INPUTS is taken to affect every component.
+UNSCORED_INPUTS = {
+    "name",
+    "description",
+    "field_name",
+    "project",
+    "manned",
+    "distance_to_shore",
+    "distance_to_shipping_lane",
+    "api_seismic_zone",
+    "number_of_bays",
+    "number_of_main_piles",
+    "number_of_skirt_piles",
+    "number_of_decks",
+    "deck_weight",
+    "pile_penetration_depth",
+    "jacket_repaired",
+    "deck_extension",
+    "crane",
+    "helideck",
+    "boatlanding",
+    "anode_grade",
+    "environmental_consequence_description",
+    "economic_consequence_description",
+    "scope_of_survey",
+    "other_detail",
+    "version",
+}
+
+SCORE_GROUPS = {
+    "robustness_score": (
+        "platform_vintage_score",
+        "platform_legs_and_bracing_score",
+        "leg_pile_grouting_score",
+        "shallow_gas_score",
+    ),
+    "condition_score": (
+        "last_inspection_score",
+        "mechanical_damage_score",
+        "corrosion_score",
+        "marine_growths_score",
+        "scour_score",
+        "flooded_member_score",
+        "unprotected_appurtenances_score",
+    ),
+    "loading_score": (
+        "deck_load_score",
+        "deck_elevation_wave_in_deck_score",
+        "additional_appurtenance_score",
+        "fatigue_load_score",
+    ),
+}
+
+
+def affected_score_components(changed) -> List[str]:
+    """
+    Score components of ``PlatformSerializer`` whose inputs are among the
+    changed platform fields and child blocks, plus the totals and rankings
+    built on them. An input neither mapped nor in ``UNSCORED_INPUTS``
+    affects every component.
+    """
+    changed = set(changed) - UNSCORED_INPUTS
+    if changed - set().union(*SCORE_COMPONENT_INPUTS.values(), {"reserve_strength_ratio_score"}):
+        # Not known to the map, recompute everything
+        affected = set(SCORE_COMPONENT_INPUTS)
+        changed.add("reserve_strength_ratio_score")
+    else:
+        affected = {
+            component
+            for component, inputs in SCORE_COMPONENT_INPUTS.items()
+            if inputs & changed
+        }
+
+    if "reserve_strength_ratio_score" in changed:
+        # An RSR override zeroes every score component
+        affected.update(component for parts in SCORE_GROUPS.values() for component in parts)
+        affected.add("rsr_override_score")
+
+    for group, parts in SCORE_GROUPS.items():
+        if affected.intersection(parts):
+            affected.add(group)
+
+    if affected.intersection(SCORE_GROUPS) or "rsr_override_score" in affected:
+        affected.update(("total_score", "lof_ranking"))
+
+    if affected.intersection(("lof_ranking", "final_consequence_category")):
+        affected.update(("risk_ranking", "risk_based_underwater_inspection_interval"))
+
+    return sorted(affected)
+
 
 class UserSerializer(serializers.ModelSerializer):
     id = serializers.ReadOnlyField()
@@ -87,10 +243,30 @@ class ProjectOwnershipSerializer(serializers.HyperlinkedModelSerializer):
 class ProjectSerializer(serializers.ModelSerializer):
     id = serializers.ReadOnlyField()
     users = ProjectOwnershipSerializer(source = 'project_name',many=True)
+    platform_stats = serializers.SerializerMethodField(read_only=True)
     class Meta:
         model = Project
         fields = "__all__"
 
+    def get_platform_stats(self, obj: Project):
+        """
+        Only for projects from ``Project.objects.with_platform_stats()``. The
+        risk figures cover the ``scored`` platforms whose stored scores are
+        fresh, see ``manage.py recompute_scores``.
+        """
+        if not hasattr(obj, "platform_count"):
+            return None
+
+        return {
+            "count": obj.platform_count,
+            "scored": obj.scored_platform_count,
+            "risk_rankings": {
+                ranking: getattr(obj, f"risk_ranking_{ranking}") for ranking in RISK_RANKING_LEVELS
+            },
+            "worst_lof_ranking": obj.worst_lof_ranking,
+            "next_inspection_year": obj.next_inspection_year,
+        }
+
 # class SiteSerializer(serializers.ModelSerializer):
 #     id = serializers.ReadOnlyField()
 
@@ -192,6 +368,157 @@ class MarineGrowthSerializer(serializers.ModelSerializer):
         exclude = ()
 
 
+class MarineGrowthBandSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = MarineGrowth
+        exclude = ("platform",)
+
+
+def _band_range(band: Dict):
+    depths = (band.get("marine_growth_depths_from_el"), band.get("marine_growth_depths_to_el"))
+    if None in depths:
+        return None
+    return min(depths), max(depths)
+
+
+class BandRanges:
+    """
+    Elevation ranges of a marine growth profile, kept sorted to reject a band
+    overlapping one added before. Bands may touch.
+    """
+
+    def __init__(self):
+        self.ranges = []
+
+    def add(self, band: Dict):
+        band_range = _band_range(band)
+        if band_range is None:
+            return
+
+        i = bisect.bisect(self.ranges, band_range)
+        for other in self.ranges[max(i - 1, 0): i + 1]:
+            if band_range[0] < other[1] and other[0] < band_range[1]:
+                raise serializers.ValidationError(
+                    f"Band {band_range[0]}..{band_range[1]} overlaps band {other[0]}..{other[1]}."
+                )
+
+        self.ranges.insert(i, band_range)
+
+
+class MarineGrowthProfileSerializer(serializers.Serializer):
+    """
+    Many elevation bands of the platform given as ``context["platform"]``.
+    ``replace`` makes them the whole profile, ``upsert`` updates the bands
+    with an ``id`` and adds the others. Bands of the resulting profile may
+    touch but not overlap.
+    """
+
+    REPLACE = "replace"
+    UPSERT = "upsert"
+
+    mode = serializers.ChoiceField(choices=(REPLACE, UPSERT), default=REPLACE)
+
+    bands = MarineGrowthBandSerializer(many=True)
+
+    def validate(self, attrs: Dict):
+        platform: Platform = self.context["platform"]
+        bands = attrs["bands"]
+
+        ids = [band["id"] for band in bands if "id" in band]
+        if len(ids) != len(set(ids)):
+            raise serializers.ValidationError("Duplicate band ids.")
+
+        existing = {}
+        if attrs["mode"] == self.UPSERT:
+            existing = {
+                marine_growth.pk: {
+                    "marine_growth_depths_from_el": marine_growth.marine_growth_depths_from_el,
+                    "marine_growth_depths_to_el": marine_growth.marine_growth_depths_to_el,
+                }
+                for marine_growth in MarineGrowth.objects.filter(platform=platform)
+            }
+            unknown = set(ids) - set(existing)
+            if unknown:
+                raise serializers.ValidationError(
+                    f"Bands {sorted(unknown)} do not belong to this platform."
+                )
+        elif ids:
+            raise serializers.ValidationError("Bands to replace a profile with cannot have ids.")
+
+        ranges = BandRanges()
+        for band in [band for pk, band in existing.items() if pk not in ids] + bands:
+            ranges.add(band)
+
+        return attrs
+
+    @transaction.atomic()
+    def create(self, validated_data: Dict):
+        """
+        Write the profile with one bulk statement per kind of change and bump
+        the platform version once.
+
+        :return: the bands of the platform
+        """
+        platform: Platform = self.context["platform"]
+        bands = validated_data["bands"]
+
+        if validated_data["mode"] == self.REPLACE:
+            MarineGrowth.objects.filter(platform=platform).delete()
+
+        updated = [MarineGrowth(platform=platform, **band) for band in bands if "id" in band]
+        if updated:
+            MarineGrowth.objects.bulk_update(
+                updated,
+                [
+                    field.name
+                    for field in MarineGrowth._meta.concrete_fields
+                    if not field.primary_key and field.name != "platform"
+                ],
+            )
+
+        MarineGrowth.objects.bulk_create(
+            [MarineGrowth(platform=platform, **band) for band in bands if "id" not in band]
+        )
+
+        Platform.objects.filter(pk=platform.pk).bump_version()
+
+        return list(MarineGrowth.objects.filter(platform=platform).order_by("pk"))
+
+
+@transaction.atomic()
+def replace_marine_growth_profile(platform: Platform, records, batch_size: int) -> int:
+    """
+    Replace the profile of ``platform`` with streamed band ``records``,
+    validating and inserting ``batch_size`` bands at a time. Raises
+    ``ValidationError`` and leaves the profile untouched on the first
+    invalid band.
+
+    :return: number of bands saved
+    """
+    MarineGrowth.objects.filter(platform=platform).delete()
+
+    ranges = BandRanges()
+    count = 0
+    for batch in batched(records, batch_size):
+        serializer = MarineGrowthBandSerializer(data=batch, many=True)
+        serializer.is_valid(raise_exception=True)
+
+        for band in serializer.validated_data:
+            if "id" in band:
+                raise serializers.ValidationError("Bands to replace a profile with cannot have ids.")
+            ranges.add(band)
+
+        MarineGrowth.objects.bulk_create(
+            [MarineGrowth(platform=platform, **band) for band in serializer.validated_data]
+        )
+        count += len(batch)
+
+    Platform.objects.filter(pk=platform.pk).bump_version()
+    return count
+
+
 class ScourSerializer(serializers.ModelSerializer):
     id = serializers.ReadOnlyField()
 
@@ -281,7 +608,61 @@ class OtherDetailSerializer(serializers.ModelSerializer):
         model = OtherDetail
         exclude=("platform",)
 
+
+class JobSerializer(serializers.ModelSerializer):
+    id = serializers.ReadOnlyField()
+
+    payload = serializers.JSONField(source="payload_data", read_only=True)
+
+    result = serializers.JSONField(source="result_data", read_only=True)
+
+    class Meta:
+        model = Job
+        exclude = ("run_after", "locked_by", "locked_at", "created_by")
+
+
+class InspectionDatesSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Platform
+        fields = (
+            "level_1_last_inspection_date",
+            "level_2_last_inspection_date",
+            "level_3_last_inspection_date",
+        )
+
+def _comparable(value):
+    return value.pk if isinstance(value, models.Model) else value
+
+
+def _current_value(obj, name: str):
+    field = obj._meta.get_field(name)
+    return getattr(obj, field.attname if field.is_relation else name)
+
+
+def per_serializer_cache(method):
+    """
+    Like ``lru_cache(maxsize=1)``, but kept on the serializer rather than the
+    class, so serializers rendering on different threads do not evict each
+    other's results.
+    """
+
+    @wraps(method)
+    def cached(self, obj):
+        cache = self.__dict__.setdefault("_method_cache", {})
+        entry = cache.get(method.__name__)
+        if entry is None or entry[0] is not obj:
+            entry = cache[method.__name__] = (obj, method(self, obj))
+        return entry[1]
+
+    return cached
+
+
 class PlatformSerializer(serializers.ModelSerializer):
+    """
+    Pass ``without_access=True`` in the context to leave out the fields that
+    depend on the requesting user, e.g. for cached payloads.
+    """
+
     id = serializers.ReadOnlyField()
 
     platform_vintage_score = serializers.SerializerMethodField(read_only=True)
@@ -417,19 +798,19 @@ class PlatformSerializer(serializers.ModelSerializer):
 
     next_10_years_inspection_plan = serializers.SerializerMethodField(read_only=True)
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_next_10_years_inspection_plan(self, obj: Platform):
         return Next10YearsInspectionPlanCalculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_level_1_next_inspection_date(self, obj: Platform):
         return Level1NextInspectionDateCalculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_level_2_next_inspection_date(self, obj: Platform):
         return Level2NextInspectionDateCalculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_level_3_next_inspection_date(self, obj: Platform):
         return Level3NextInspectionDateCalculator(obj)._calculate()
 
@@ -437,99 +818,99 @@ class PlatformSerializer(serializers.ModelSerializer):
     # def get_risk_ranking(self, obj: Platform):
     #     return RiskRankingCalculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_final_consequence_category(self, obj: Platform):
         return FinalConsequenceCategoryCalculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_structure_replacement_decision(self, obj: Platform):
         return StructureReplacementDecisionCalculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_calculate_economic_impact_remaining_life_services(self, obj: Platform):
         return CalculateEconomicImpactRemainingLifeServicesCalculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_calculated_economic_impact_consequence(self, obj: Platform):
         return CalculatedEconmicImpactConsequenceCalculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_exposure_category_level(self, obj: Platform):
         return ExposureCategoryLevelCalculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_exposure_category_level_1(self, obj: Platform):
         return ExposureCategorySurveyLevel1Calculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_exposure_category_level_2(self, obj: Platform):
         return ExposureCategorySurveyLevel2Calculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_exposure_category_level_3(self, obj: Platform):
         return ExposureCategorySurveyLevel3Calculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_platform_vintage_score(self, obj: Platform):
         return PlatformVintageScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_platform_legs_and_bracing_score(self, obj: Platform):
         return PlatformLegsAndBracingScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_leg_pile_grouting_score(self, obj: Platform):
         return LegPileGroutingScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_shallow_gas_score(self, obj: Platform):
         return ShallowGasScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_last_inspection_score(self, obj: Platform):
         return LastInspectionScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_mechanical_damage_score(self, obj: Platform):
         return MechanicalDamageScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_corrosion_score(self, obj: Platform):
         return CorrosionScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_marine_growths_score(self, obj: Platform):
         return MarineGrowthScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_marine_growth_each_elevation(self, obj: Platform):
         return MarineGrowthEachElevationCalculator(obj)._calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_scour_score(self, obj: Platform):
         return ScourCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_flooded_member_score(self, obj: Platform):
         return FloodedMemberScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_unprotected_appurtenances_score(self, obj: Platform):
         return UnprotectedAppurtenancesScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_deck_load_score(self, obj: Platform):
         return DeckLoadScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_deck_elevation_wave_in_deck_score(self, obj: Platform):
         return DeckElevationWaveInDeckScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_additional_appurtenance_score(self, obj: Platform):
         return AdditionalAppurtenanceScoreCalculator(obj).calculate()
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_fatigue_load_score(self, obj: Platform):
         return FatigueLoadScoreCalculator(obj).calculate()
 
@@ -545,7 +926,7 @@ class PlatformSerializer(serializers.ModelSerializer):
     #         .with_access_type(user=request.user)[0]
     #         .access_type
     #     )
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_view_access(self, obj: Platform):
         request = self.context.get("request")
         if request.user.is_superuser:
@@ -556,7 +937,7 @@ class PlatformSerializer(serializers.ModelSerializer):
             return platform.view_access
         return False
     
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_modify_access(self, obj: Platform):
         request = self.context.get("request")
         if request.user.is_superuser:
@@ -567,7 +948,7 @@ class PlatformSerializer(serializers.ModelSerializer):
             return platform.modify_access
         return False
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_robustness_score(self, obj: Platform):
         return (
             self.get_platform_vintage_score(obj)
@@ -576,7 +957,7 @@ class PlatformSerializer(serializers.ModelSerializer):
             + self.get_shallow_gas_score(obj)
         )
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_condition_score(self, obj: Platform):
         return (
             self.get_last_inspection_score(obj)
@@ -588,7 +969,7 @@ class PlatformSerializer(serializers.ModelSerializer):
             + self.get_unprotected_appurtenances_score(obj)
         )
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_loading_score(self, obj: Platform):
         return (
             self.get_deck_load_score(obj)
@@ -597,7 +978,7 @@ class PlatformSerializer(serializers.ModelSerializer):
             + self.get_fatigue_load_score(obj)
         )
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_total_score(self, obj: Platform):
         return (
             self.get_robustness_score(obj)
@@ -606,73 +987,17 @@ class PlatformSerializer(serializers.ModelSerializer):
             + obj.rsr_override_score
         )
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_lof_ranking(self, obj: Platform):
-        score = self.get_total_score(obj)
-
-        if score >= 680:
-            return 5
-        elif 490 <= score < 680:
-            return 4
-        elif 310 <= score < 490:
-            return 3
-        elif 120 <= score < 310:
-            return 2
-        else:
-            return 1
-
-    @lru_cache(maxsize=1)
+        return LofRankingCalculator.rank(self.get_total_score(obj))
+
+    @per_serializer_cache
     def get_risk_ranking(self, obj: Platform):
         clof_88 = self.get_lof_ranking(obj)
         clof_105 = FinalConsequenceCategoryCalculator(obj)._calculate()
-        clof_106 = None
-        if clof_105 == "A":
-            if clof_88 == 1 or clof_88 == 2:
-                clof_106 = 'VL'
-            elif clof_88 == 3 or clof_88 == 4:
-                clof_106 = 'L'
-            elif clof_88 == 5:
-                clof_106 = 'M'
-        
-        elif clof_105 == "B":
-            if clof_88 == 1:
-                clof_106 = 'VL'
-            elif clof_88 == 2 or clof_88 == 3:
-                clof_106 = 'L'
-            elif clof_88 == 4:
-                clof_106 = 'M'
-            elif clof_88 == 5:
-                clof_106 = 'H'
-        
-        elif clof_105 == "C":
-            if clof_88 == 1 or clof_88 == 2:
-                clof_106 = 'L'
-            elif clof_88 == 3:
-                clof_106 = 'M'
-            elif clof_88 == 4 or clof_88 == 5:
-                clof_106 = 'H'
-        
-        elif clof_105 == "D":
-            if clof_88 == 1:
-                clof_106 = 'L'
-            elif clof_88 == 2:
-                clof_106 = 'M'
-            elif clof_88 == 3 or clof_88 == 4:
-                clof_106 = 'H'
-            elif clof_88 == 5:
-                clof_106 = 'VH'
-        
-        elif clof_105 == "E":
-            if clof_88 == 1:
-                clof_106 = 'M'
-            elif clof_88 == 2 or clof_88 == 3:
-                clof_106 = 'H'
-            elif clof_88 == 4 or clof_88 == 5:
-                clof_106 = 'VH'
-
-        return clof_106
+        return RiskRankingCalculator.rank(clof_88, clof_105)
 
-    @lru_cache(maxsize=1)
+    @per_serializer_cache
     def get_risk_based_underwater_inspection_interval(self, obj: Platform):
         clof_106 = self.get_risk_ranking(obj)
         clof_107 = None
@@ -695,83 +1020,132 @@ class PlatformSerializer(serializers.ModelSerializer):
 
     @transaction.atomic()
     def update(self, instance: Platform, validated_data: Dict):
-        # print("update ",validated_data)
-        shallow_gas = validated_data.pop("shallow_gas")
-        ShallowGas.objects.filter(platform=instance).update(**shallow_gas)
+        """
+        Write only what differs from the current values. Child blocks left out
+        of a partial update are not touched. The names of the affected score
+        components are kept in ``self.affected_score_components``.
+        """
+        changed = []
+
+        for related_name in CHILD_RELATED_FIELDS:
+            inputs = validated_data.pop(related_name, None)
+            if inputs is None:
+                continue
+
+            child = getattr(instance, related_name)
+            modified = {
+                name: value
+                for name, value in inputs.items()
+                if _current_value(child, name) != _comparable(value)
+            }
+            if not modified:
+                continue
+
+            type(child).objects.filter(platform=instance).update(**modified)
+            for name, value in modified.items():
+                setattr(child, name, value)
+            changed.append(related_name)
+
+        update_fields = [
+            name
+            for name, value in validated_data.items()
+            if _current_value(instance, name) != _comparable(value)
+        ]
+        for name in update_fields:
+            setattr(instance, name, validated_data[name])
+
+        if changed:
+            instance.version += 1
+            update_fields.append("version")
+
+        if update_fields:
+            instance.save(update_fields=[*update_fields, "updated_at"])
+
+        self.affected_score_components = affected_score_components(changed + update_fields)
+        return instance
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get("without_access"):
+            for name in ACCESS_FIELDS:
+                fields.pop(name)
+        return fields
 
-        last_inspection = validated_data.pop("last_inspection")
-        LastInspection.objects.filter(platform=instance).update(**last_inspection)
+    # project = ProjectSerializer(read_only=True)
+    class Meta:
+        model = Platform
+        exclude = ("users", "version")
 
-        leg_pile_grouting = validated_data.pop("leg_pile_grouting")
-        LegPileGrouting.objects.filter(platform=instance).update(**leg_pile_grouting)
+class BulkPlatformSerializer(serializers.ModelSerializer):
+    """
+    One record of a bulk platform upload: the ``SavePlatform`` keys, platform
+    inputs under their field names and child inputs under the child's
+    related name, checked with the child serializers of
+    ``PlatformSerializer``. The project, responsible user and reference ids
+    are only checked for type, the view looks them up for a whole batch.
+    """
 
-        mechanical_damage = validated_data.pop("mechanical_damage")
-        MechanicalDamage.objects.filter(platform=instance).update(**mechanical_damage)
+    Name = serializers.CharField(source="name", max_length=250)
 
-        corrosion = validated_data.pop("corrosion")
-        Corrosion.objects.filter(platform=instance).update(**corrosion)
+    Description = serializers.CharField(
+        source="description", max_length=500, required=False, allow_blank=True
+    )
 
-        scour = validated_data.pop("scour")
-        Scour.objects.filter(platform=instance).update(**scour)
+    # Read by SavePlatform but not stored
+    StartDate = serializers.CharField(required=False, allow_null=True, allow_blank=True)
 
-        flooded_member = validated_data.pop("flooded_member")
-        FloodedMember.objects.filter(platform=instance).update(**flooded_member)
+    Project = serializers.IntegerField(source="project_id")
 
-        unprotected_appurtenances = validated_data.pop("unprotected_appurtenances")
-        UnprotectedAppurtenances.objects.filter(platform=instance).update(
-            **unprotected_appurtenances
-        )
+    Responsible = serializers.IntegerField()
 
-        deck_load = validated_data.pop("deck_load")
-        DeckLoad.objects.filter(platform=instance).update(**deck_load)
+    platform_manned_status_id = serializers.IntegerField(required=False, allow_null=True)
 
-        deck_elevation_wave_in_deck = validated_data.pop("deck_elevation_wave_in_deck")
-        DeckElevationWaveInDeck.objects.filter(platform=instance).update(
-            **deck_elevation_wave_in_deck
-        )
+    bracing_type_id = serializers.IntegerField(required=False, allow_null=True)
 
-        additional_appurtenance = validated_data.pop("additional_appurtenance")
-        AdditionalAppurtenance.objects.filter(platform=instance).update(
-            **additional_appurtenance
-        )
+    number_of_legs_type_id = serializers.IntegerField(required=False, allow_null=True)
 
-        fatigue_load = validated_data.pop("fatigue_load")
-        FatigueLoad.objects.filter(platform=instance).update(**fatigue_load)
+    def get_fields(self):
+        fields = super().get_fields()
+        for related_name in CHILD_RELATED_FIELDS:
+            fields[related_name] = type(PlatformSerializer._declared_fields[related_name])(
+                required=False
+            )
+        return fields
 
-        reserve_strength_ratio_score = validated_data.pop(
-            "reserve_strength_ratio_score"
-        )
-        ReserveStrengthRatioScore.objects.filter(platform=instance).update(
-            **reserve_strength_ratio_score
-        )
-
-        environmental_consequence = validated_data.pop("environmental_consequence")
-        EnvironmentalConsequence.objects.filter(platform=instance).update(
-            **environmental_consequence
-        )
-
-        economic_impact_consequence = validated_data.pop("economic_impact_consequence")
-        EconomicImpactConsequence.objects.filter(platform=instance).update(
-            **economic_impact_consequence
+    class Meta:
+        model = Platform
+        exclude = (
+            "id",
+            "project",
+            "name",
+            "description",
+            "users",
+            "version",
+            "created_at",
+            "updated_at",
+            "platform_manned_status",
+            "bracing_type",
+            "number_of_legs_type",
         )
 
-        scope_of_survey = validated_data.pop("scope_of_survey")
-        # print(scope_of_survey)
-        ScopeOfSurvey.objects.filter(platform=instance).update(
-            **scope_of_survey
-        )
 
-        other_detail = validated_data.pop("other_detail")
-        OtherDetail.objects.filter(platform=instance).update(
-            **other_detail
-        )
+def platform_access(user, platform_ids) -> Dict:
+    """
+    ``{platform id: (view_access, modify_access)}`` for ``user`` in one
+    query, with the same lookup as ``PlatformSerializer.get_view_access``
+    and ``get_modify_access``.
+    """
+    if user.is_superuser:
+        return {platform_id: (True, True) for platform_id in platform_ids}
 
-        return super().update(instance, validated_data)
+    access = {platform_id: (False, False) for platform_id in platform_ids}
+    ownerships = PlatformOwnership.objects.filter(pk__in=platform_ids, user=user)
+    for pk, view_access, modify_access in ownerships.values_list(
+        "pk", "view_access", "modify_access"
+    ):
+        access[pk] = (view_access, modify_access)
+    return access
 
-    # project = ProjectSerializer(read_only=True)
-    class Meta:
-        model = Platform
-        exclude = ("users",)
 
 class PlatformNormalSerializer(serializers.ModelSerializer):
     class Meta:
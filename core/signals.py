@@ -0,0 +1,109 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from . import registry
+from .authentication import user_cache
+from .versions import bump_reference_version
+from .visibility import bump_access_versions, bump_auth_versions
+from .models import (
+    PlatformType,
+    BracingType,
+    NumberOfLegsType,
+    PlatformMannedStatus,
+    EffectiveAccess,
+    Platform,
+    PlatformOwnership,
+    ProjectOwnership,
+    User,
+    access_changed,
+)
+
+
+@receiver(post_save, sender=PlatformType)
+@receiver(post_save, sender=BracingType)
+@receiver(post_save, sender=NumberOfLegsType)
+@receiver(post_save, sender=PlatformMannedStatus)
+@receiver(post_delete, sender=PlatformType)
+@receiver(post_delete, sender=BracingType)
+@receiver(post_delete, sender=NumberOfLegsType)
+@receiver(post_delete, sender=PlatformMannedStatus)
+def invalidate_reference_data(sender, **kwargs):
+    # Scores, cached payloads and ETags depend on the reference version. It is
+    # bumped again on commit in case another worker reloaded in between.
+    registry.invalidate()
+    bump_reference_version()
+    transaction.on_commit(bump_reference_version)
+
+
+@receiver(post_save, sender=PlatformOwnership)
+@receiver(post_delete, sender=PlatformOwnership)
+def bump_platform_version(sender, instance: PlatformOwnership, **kwargs):
+    Platform.objects.filter(pk=instance.platform_id).bump_version()
+
+
+@receiver(post_save, sender=ProjectOwnership)
+@receiver(post_delete, sender=ProjectOwnership)
+def bump_project_platform_versions(sender, instance: ProjectOwnership, **kwargs):
+    Platform.objects.filter(project_id=instance.project_id).bump_version()
+
+
+@receiver(pre_save, sender=PlatformOwnership)
+@receiver(pre_save, sender=ProjectOwnership)
+def remember_previous_owner(sender, instance, **kwargs):
+    # An ownership moved to another user, platform or project must also be
+    # revoked where it was
+    instance._previous = (
+        sender.objects.filter(pk=instance.pk).first() if instance.pk else None
+    )
+
+
+def _previous(instance):
+    previous = getattr(instance, "_previous", None)
+    instance._previous = None
+    return previous
+
+
+@receiver(post_save, sender=PlatformOwnership)
+@receiver(post_delete, sender=PlatformOwnership)
+def refresh_platform_access(sender, instance: PlatformOwnership, **kwargs):
+    ownerships = (instance, _previous(instance))
+    scopes = {(ownership.platform_id, ownership.user_id) for ownership in ownerships if ownership}
+    for platform_id, user_id in scopes:
+        EffectiveAccess.objects.refresh([platform_id], [user_id])
+
+
+@receiver(post_save, sender=ProjectOwnership)
+@receiver(post_delete, sender=ProjectOwnership)
+def refresh_project_access(sender, instance: ProjectOwnership, **kwargs):
+    ownerships = (instance, _previous(instance))
+    scopes = {(ownership.project_id, ownership.user_id) for ownership in ownerships if ownership}
+    for project_id, user_id in scopes:
+        EffectiveAccess.objects.refresh(
+            Platform.objects.filter(project_id=project_id).values("pk"), [user_id]
+        )
+
+
+@receiver(post_save, sender=Platform)
+def refresh_new_platform_access(sender, instance: Platform, created, update_fields, **kwargs):
+    # Access is inherited from the project. Bulk creates refresh it themselves.
+    if created or update_fields is None or "project" in update_fields:
+        EffectiveAccess.objects.refresh([instance.pk])
+
+
+@receiver(access_changed, sender=EffectiveAccess)
+def invalidate_visible_ids(sender, user_ids, **kwargs):
+    bump_access_versions(user_ids)
+
+
+# User fields authentication and permission checks read
+AUTH_USER_FIELDS = {"is_active", "is_superuser", "project_create_access"}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance: User, update_fields=None, **kwargs):
+    # QuerySet.update sends no signal, its callers bump the versions themselves
+    if update_fields is None or AUTH_USER_FIELDS & set(update_fields):
+        bump_auth_versions([instance.pk])
+        user_cache.invalidate(instance.pk)
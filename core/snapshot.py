@@ -0,0 +1,289 @@
+"""
+Versioned, memory-mapped snapshots of every scoring input of the fleet.
+
+A snapshot is a directory holding ``platform.col`` (the platform row and its
+one-to-one scoring children, one column per field) and ``marine_growth.col``.
+Analytics tools open it in milliseconds and rebuild in-memory ``Platform``
+instances that the calculators can score without a database connection.
+"""
+import datetime
+import json
+import os
+import tempfile
+from decimal import Decimal
+from typing import Iterator
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from . import registry
+from .columnar import ColumnarFile, write_columns
+from .prefetch import attach_prefetched
+from .fleet import EPOCH, timestamp_us
+from .models import Platform, MarineGrowth, SCORING_RELATED_FIELDS
+
+# Stands for NULL in integer-backed columns
+NULL = -(2 ** 63)
+
+# Text column ``name`` holds the end offset of each value in blob ``name#bytes``
+TEXT_BYTES = "#bytes"
+
+LATEST = "LATEST"
+
+PLATFORM_FILE = "platform.col"
+MARINE_GROWTH_FILE = "marine_growth.col"
+REFERENCE_FILE = "reference.json"
+
+
+def snapshot_dir() -> str:
+    return settings.INPUT_SNAPSHOT_DIR
+
+
+def _kind(field: models.Field) -> str:
+    if isinstance(field, models.DecimalField):
+        return f"decimal:{field.decimal_places}"
+    if isinstance(field, models.BooleanField):
+        return "bool"
+    if isinstance(field, models.DateTimeField):
+        return "datetime"
+    if isinstance(field, models.DateField):
+        return "date"
+    if isinstance(field, (models.IntegerField, models.AutoField, models.ForeignKey)):
+        return "int"
+    return "text"
+
+
+def _encode(kind: str, value):
+    if value is None:
+        return -1 if kind == "bool" else NULL
+    if kind == "bool":
+        return int(value)
+    if kind == "datetime":
+        return timestamp_us(value)
+    if kind == "date":
+        return value.toordinal()
+    if kind.startswith("decimal:"):
+        return int(value.scaleb(int(kind.split(":")[1])))
+    return value
+
+
+def _decode(kind: str, value):
+    if value == (-1 if kind == "bool" else NULL):
+        return None
+    if kind == "bool":
+        return bool(value)
+    if kind == "datetime":
+        return EPOCH + datetime.timedelta(microseconds=value)
+    if kind == "date":
+        return datetime.date.fromordinal(value)
+    if kind.startswith("decimal:"):
+        return Decimal(value).scaleb(-int(kind.split(":")[1]))
+    return value
+
+
+def _fields(model, exclude=()):
+    return [
+        field
+        for field in model._meta.concrete_fields
+        if field.name not in exclude
+    ]
+
+
+def _child_models():
+    return {
+        name: Platform._meta.get_field(name).related_model
+        for name in SCORING_RELATED_FIELDS
+    }
+
+
+def _columns(model, exclude=(), prefix=""):
+    return {
+        f"{prefix}{field.attname}": (field.attname, _kind(field))
+        for field in _fields(model, exclude)
+    }
+
+
+def _write_table(path, columns, rows):
+    """
+    :param columns: ``{column: (attname, kind)}``
+    :param rows: iterable of ``{column: value}``
+    """
+    values = {column: [] for column in columns}
+    text = {column: bytearray() for column, (_, kind) in columns.items() if kind == "text"}
+    for row in rows:
+        for column, (_, kind) in columns.items():
+            value = row[column]
+            if kind != "text":
+                values[column].append(_encode(kind, value))
+            elif value is None:
+                values[column].append(NULL)
+            else:
+                text[column] += value.encode()
+                values[column].append(len(text[column]))
+
+    write_columns(
+        path,
+        {column: ("q", values[column]) for column in columns},
+        meta={"kinds": {column: kind for column, (_, kind) in columns.items()}},
+        blobs={f"{column}{TEXT_BYTES}": bytes(data) for column, data in text.items()},
+    )
+
+
+def _platform_columns():
+    columns = _columns(Platform)
+    for name, model in _child_models().items():
+        columns.update(_columns(model, exclude=("id", "platform"), prefix=f"{name}."))
+    return columns
+
+
+def write_snapshot(directory: str = None) -> str:
+    """
+    Write a new snapshot of the fleet inputs and point ``LATEST`` at it.
+
+    :return: path of the snapshot directory
+    """
+    directory = directory or snapshot_dir()
+    name = "inputs-" + timezone.now().strftime("%Y%m%dT%H%M%S%f")
+    path = os.path.join(directory, name)
+    os.makedirs(path)
+
+    platform_columns = _platform_columns()
+    child_models = _child_models()
+
+    def platform_rows():
+        for platform in Platform.objects.with_scoring_inputs().chunked():
+            row = {}
+            for column, (attname, _) in platform_columns.items():
+                name = column.rpartition(".")[0]
+                obj = getattr(platform, name) if name in child_models else platform
+                row[column] = getattr(obj, attname)
+            yield row
+
+    _write_table(os.path.join(path, PLATFORM_FILE), platform_columns, platform_rows())
+
+    marine_growth_columns = _columns(MarineGrowth)
+    _write_table(
+        os.path.join(path, MARINE_GROWTH_FILE),
+        marine_growth_columns,
+        (
+            {column: getattr(marine_growth, attname) for column, (attname, _) in marine_growth_columns.items()}
+            for marine_growth in MarineGrowth.objects.order_by("platform_id", "pk").iterator()
+        ),
+    )
+
+    reference = {
+        table: [
+            {field.attname: getattr(obj, field.attname) for field in _fields(model)}
+            for obj in model.objects.order_by("pk")
+        ]
+        for table, model in registry.REFERENCE_MODELS.items()
+    }
+    with open(os.path.join(path, REFERENCE_FILE), "w") as file:
+        json.dump(reference, file)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    with os.fdopen(fd, "w") as file:
+        file.write(name)
+    os.replace(tmp_path, os.path.join(directory, LATEST))
+
+    return path
+
+
+class InputSnapshot:
+    """
+    Read-only view of a snapshot directory, by default the latest one.
+    """
+
+    def __init__(self, path: str = None):
+        if path is None:
+            with open(os.path.join(snapshot_dir(), LATEST)) as file:
+                path = os.path.join(snapshot_dir(), file.read().strip())
+
+        self.path = path
+        self.platforms_file = ColumnarFile(os.path.join(path, PLATFORM_FILE))
+        self.marine_growths_file = ColumnarFile(os.path.join(path, MARINE_GROWTH_FILE))
+
+    def __len__(self):
+        return len(self.platforms_file)
+
+    def column(self, name: str):
+        """
+        Decoded values of one platform column, e.g. ``"corrosion.cp_design_life"``.
+        """
+        return self._decoded(self.platforms_file, name)
+
+    @staticmethod
+    def _decoded(table: ColumnarFile, name: str):
+        kind = table.meta["kinds"][name]
+        if kind == "text":
+            return InputSnapshot._text(table[name], table[f"{name}{TEXT_BYTES}"])
+        return [_decode(kind, value) for value in table[name]]
+
+    @staticmethod
+    def _text(ends, data):
+        values = []
+        start = 0
+        for end in ends:
+            if end == NULL:
+                values.append(None)
+            else:
+                values.append(str(data[start:end], "utf-8"))
+                start = end
+        return values
+
+    @staticmethod
+    def _rows(table: ColumnarFile):
+        columns = {name: InputSnapshot._decoded(table, name) for name in table.meta["kinds"]}
+        for i in range(len(table)):
+            yield {name: values[i] for name, values in columns.items()}
+
+    def install_reference_data(self):
+        """
+        Serve the snapshot's reference tables from the registry, so that
+        scoring does not need the database.
+        """
+        with open(os.path.join(self.path, REFERENCE_FILE)) as file:
+            reference = json.load(file)
+
+        registry.install(
+            **{
+                table: {row["id"]: model(**row) for row in reference[table]}
+                for table, model in registry.REFERENCE_MODELS.items()
+            }
+        )
+
+    def platforms(self) -> Iterator[Platform]:
+        """
+        Unsaved ``Platform`` instances with their scoring children and marine
+        growths attached, ready for the calculators.
+        """
+        marine_growths = {}
+        for row in self._rows(self.marine_growths_file):
+            marine_growths.setdefault(row["platform_id"], []).append(MarineGrowth(**row))
+
+        child_models = _child_models()
+        platform_fields = set(_columns(Platform))
+
+        for row in self._rows(self.platforms_file):
+            platform = Platform(**{column: row[column] for column in platform_fields})
+
+            for name, model in child_models.items():
+                prefix = f"{name}."
+                child = model(
+                    platform_id=platform.pk,
+                    **{
+                        column[len(prefix):]: value
+                        for column, value in row.items()
+                        if column.startswith(prefix)
+                    },
+                )
+                setattr(platform, name, child)
+
+            attach_prefetched(platform, "marine_growths", marine_growths.get(platform.pk, []))
+
+            yield platform
+
+    def close(self):
+        self.platforms_file.close()
+        self.marine_growths_file.close()
@@ -1,3 +1,784 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connections, models
+from django.db.models import Q
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.serializers import SerializerMethodField
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import parsers, snapshot, views
+from .authentication import user_cache
+from .columnar import ColumnarFile
+from .fleet import recompute_scores
+from .parsers import iter_json_array, iter_ndjson
+from .routers import ReplicaRoutingMiddleware
+
+from .models import (
+    Corrosion,
+    DeckLoad,
+    EconomicImpactConsequence,
+    EffectiveAccess,
+    EnvironmentalConsequence,
+    FatigueLoad,
+    FloodedMember,
+    MarineGrowth,
+    Platform,
+    PlatformMannedStatus,
+    PlatformOwnership,
+    PlatformScore,
+    Project,
+    ProjectOwnership,
+    SCORING_RELATED_FIELDS,
+    User,
+)
+from .serializers import (
+    SCORE_COMPONENT_INPUTS,
+    UNSCORED_INPUTS,
+    PlatformSerializer,
+    affected_score_components,
+)
+from .visibility import bump_auth_versions
+
+FIXTURES = ["bracing_type", "number_of_legs_type", "platform_type", "platform_manned_status"]
+
+
+def platform_visibility_by_join(user):
+    return Platform.objects.filter(Q(users=user) | Q(project__users=user)).distinct()
+
+
+class VisibleToTest(TestCase):
+    fixtures = FIXTURES
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="owner")
+        cls.other = User.objects.create(username="other")
+
+        owned_project = Project.objects.create(name="owned")
+        other_project = Project.objects.create(name="other")
+        ProjectOwnership.objects.create(user=cls.user, project=owned_project)
+        ProjectOwnership.objects.create(user=cls.other, project=other_project)
+
+        cls.platforms = [
+            Platform.objects.create(name=f"platform {i}", project=project)
+            for i, project in enumerate([owned_project] * 2 + [other_project] * 3)
+        ]
+        # Owned both directly and through its project
+        PlatformOwnership.objects.create(user=cls.user, platform=cls.platforms[0])
+        PlatformOwnership.objects.create(user=cls.user, platform=cls.platforms[2])
+
+        for platform in cls.platforms:
+            MarineGrowth.objects.create(
+                platform=platform,
+                marine_growth_inspected_thickness=1,
+                marine_growth_design_thickness=1,
+            )
+
+    def test_platforms_match_join(self):
+        self.assertEqual(
+            list(Platform.objects.visible_to(self.user).order_by("pk")),
+            list(platform_visibility_by_join(self.user).order_by("pk")),
+        )
+        self.assertEqual(Platform.objects.visible_to(self.user).count(), 3)
+
+    def test_marine_growths_and_projects(self):
+        self.assertEqual(
+            set(MarineGrowth.objects.visible_to(self.user).values_list("platform_id", flat=True)),
+            {self.platforms[0].pk, self.platforms[1].pk, self.platforms[2].pk},
+        )
+        self.assertEqual(
+            list(Project.objects.visible_to(self.user).values_list("name", flat=True)), ["owned"]
+        )
+
+    def test_superuser_sees_everything(self):
+        superuser = User(is_superuser=True)
+        self.assertEqual(Platform.objects.visible_to(superuser).count(), len(self.platforms))
+
+    def test_sql_uses_exists_without_distinct(self):
+        for queryset in (
+            Platform.objects.visible_to(self.user),
+            MarineGrowth.objects.visible_to(self.user),
+            Project.objects.visible_to(self.user),
+        ):
+            sql = str(queryset.query).upper()
+            self.assertIn("EXISTS", sql)
+            self.assertNotIn("DISTINCT", sql)
+            # The ownerships are only read inside the subqueries
+            self.assertNotIn("OWNERSHIP", sql.split("EXISTS")[0])
+
+
+class EffectiveAccessTest(TestCase):
+    fixtures = FIXTURES
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="user")
+        cls.projects = [Project.objects.create(name=f"project {i}") for i in range(2)]
+        cls.platform = Platform.objects.create(name="platform", project=cls.projects[0])
+
+    def access(self):
+        return {
+            (row.user_id, row.platform_id): (row.view_access, row.modify_access, row.delete_access)
+            for row in EffectiveAccess.objects.all()
+        }
+
+    def assert_access(self, expected):
+        self.assertEqual(self.access(), expected)
+        self.assertEqual(
+            set(Platform.objects.has_ownership(self.user)), set(Platform.objects.visible_to(self.user))
+        )
+
+    def test_ownerships_are_combined(self):
+        ownership = PlatformOwnership.objects.create(
+            user=self.user, platform=self.platform, view_access=True
+        )
+        self.assert_access({(self.user.pk, self.platform.pk): (True, False, False)})
+
+        ProjectOwnership.objects.create(
+            user=self.user, project=self.projects[0], view_access=False, modify_access=True
+        )
+        self.assert_access({(self.user.pk, self.platform.pk): (True, True, False)})
+
+        ownership.delete_access = True
+        ownership.save()
+        self.assert_access({(self.user.pk, self.platform.pk): (True, True, True)})
+
+        ownership.delete()
+        self.assert_access({(self.user.pk, self.platform.pk): (False, True, False)})
+
+    def test_platform_follows_its_project(self):
+        ProjectOwnership.objects.create(user=self.user, project=self.projects[1], view_access=True)
+        self.assert_access({})
+
+        self.platform.project = self.projects[1]
+        self.platform.save()
+        self.assert_access({(self.user.pk, self.platform.pk): (True, False, False)})
+
+        new = Platform.objects.create(name="new", project=self.projects[1])
+        self.assert_access(
+            {
+                (self.user.pk, self.platform.pk): (True, False, False),
+                (self.user.pk, new.pk): (True, False, False),
+            }
+        )
+
+    def test_rebuild_matches_signals(self):
+        PlatformOwnership.objects.create(user=self.user, platform=self.platform, modify_access=True)
+        ProjectOwnership.objects.create(user=self.user, project=self.projects[0], view_access=True)
+        maintained = self.access()
+
+        EffectiveAccess.objects.all().delete()
+        call_command("rebuild_effective_access", stdout=io.StringIO())
+        self.assertEqual(self.access(), maintained)
+
+
+class PlatformETagTest(TestCase):
+    fixtures = FIXTURES
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username="admin", is_superuser=True)
+        cls.platform = Platform.objects.create(
+            name="platform", project=Project.objects.create(name="project")
+        )
+
+    def setUp(self):
+        caches[settings.PLATFORM_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.urls = [reverse("platform-detail", args=[self.platform.pk]), reverse("platform-list")]
+
+    def test_not_modified_without_scoring(self):
+        for url in self.urls:
+            etag = self.client.get(url)["ETag"]
+            with mock.patch.object(PlatformSerializer, "to_representation") as to_representation:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            to_representation.assert_not_called()
+
+    def test_edit_changes_etag_and_payload(self):
+        etags = [self.client.get(url)["ETag"] for url in self.urls]
+
+        response = self.client.patch(
+            self.urls[0], {"corrosion": {"cp_design_life": 7}}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+        for url, etag in zip(self.urls, etags):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etag)
+            payload = response.json()
+            if isinstance(payload, list):
+                payload, = payload
+            self.assertEqual(payload["corrosion"]["cp_design_life"], 7)
+
+    def test_marine_growth_changes_etag(self):
+        etag = self.client.get(self.urls[0])["ETag"]
+        MarineGrowth.objects.create(
+            platform=self.platform,
+            marine_growth_inspected_thickness=2,
+            marine_growth_design_thickness=1,
+        )
+        response = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["marine_growths"]), 1)
+
+
+class ReferenceDataVersionTest(TestCase):
+    fixtures = FIXTURES
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username="admin", is_superuser=True)
+        cls.platform = Platform.objects.create(
+            name="platform",
+            project=Project.objects.create(name="project"),
+            platform_manned_status_id=1,
+        )
+
+    def setUp(self):
+        caches[settings.PLATFORM_CACHE_ALIAS].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def edit_manned_status(self):
+        status = PlatformMannedStatus.objects.get(pk=1)
+        status.ranking = "A" if status.ranking == "E" else "E"
+        status.save()
+
+    def test_etag_changes(self):
+        url = reverse("platform-detail", args=[self.platform.pk])
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.edit_manned_status()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_stored_scores_go_stale(self):
+        recompute_scores(workers=1)
+        self.assertEqual(PlatformScore.objects.fresh().count(), 1)
+
+        self.edit_manned_status()
+        self.assertEqual(PlatformScore.objects.fresh().count(), 0)
+        self.assertEqual(Project.objects.with_platform_stats().get().scored_platform_count, 0)
+
+
+class CachedUserTest(TestCase):
+    def setUp(self):
+        caches[settings.PLATFORM_CACHE_ALIAS].clear()
+        user_cache.clear()
+
+        self.user = User.objects.create(username="cached")
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(self.user)}")
+
+    def test_cached_user_costs_no_query(self):
+        self.assertEqual(self.client.get(reverse("category-list")).status_code, 200)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(reverse("category-list")).status_code, 200)
+
+    def test_deactivated_user_is_refused(self):
+        self.client.get(reverse("category-list"))
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertEqual(self.client.get(reverse("category-list")).status_code, 401)
+
+    def test_bump_after_queryset_update(self):
+        self.client.get(reverse("category-list"))
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get(reverse("category-list")).status_code, 200)
+
+        bump_auth_versions([self.user.pk])
+        self.assertEqual(self.client.get(reverse("category-list")).status_code, 401)
+
+
+YEARS = (1960, 1975, 1985, 1995, 2005, 2012, 2025)
+
+
+def input_values(field):
+    """
+    Values to try for ``field``, spread wide enough to cross the calculators'
+    thresholds.
+    """
+    if field.choices:
+        return [key for key, _ in field.choices]
+    if isinstance(field, models.ForeignKey):
+        return list(field.related_model.objects.values_list("pk", flat=True))
+    if isinstance(field, models.BooleanField):
+        return [True, False]
+    if isinstance(field, models.CharField):
+        # Consequence categories are ranked like the manned statuses
+        return list("ABCDE")
+    if isinstance(field, models.DateTimeField):
+        return [timezone.make_aware(datetime.datetime(year, 6, 1)) for year in YEARS]
+    if isinstance(field, models.DateField):
+        return [datetime.date(year, 6, 1) for year in YEARS]
+    if isinstance(field, models.DecimalField):
+        return [Decimal(value) for value in ("0.5", "1", "2", "5", "20", "100", "1000")]
+    return [1, 2, 5, 10, 30]
+
+
+class ScoreComponentInputsTest(TestCase):
+    """
+    Every input changed alone may only change the components that
+    ``affected_score_components`` reports for it.
+    """
+
+    fixtures = FIXTURES
+
+    @classmethod
+    def setUpTestData(cls):
+        def date(year):
+            return timezone.make_aware(datetime.datetime(year, 1, 1))
+
+        platform = Platform.objects.create(
+            name="platform",
+            project=Project.objects.create(name="project"),
+            # Ranked A, below every consequence category
+            platform_manned_status_id=5,
+            design_date=date(1975),
+            platform_installation_date=date(1977),
+            level_1_last_inspection_date=datetime.date(2018, 1, 1),
+            level_2_last_inspection_date=datetime.date(2017, 1, 1),
+            level_3_last_inspection_date=datetime.date(2015, 1, 1),
+        )
+        MarineGrowth.objects.create(
+            platform=platform,
+            marine_growth_depths_from_el=0,
+            marine_growth_depths_to_el=-10,
+            marine_growth_inspected_thickness=1,
+            marine_growth_design_thickness=1,
+        )
+        # Inputs the calculators skip while left at their defaults
+        EnvironmentalConsequence.objects.filter(platform=platform).update(
+            platform_type_id=1,
+            daily_oil_production=1000,
+            estimated_fraction_of_oil_production_loss_due_to_leakage=10,
+            fixed_cost_for_spill_cleanup=1000,
+            variable_cost_for_spill_cleanup=10,
+            oil_price=50,
+        )
+        EconomicImpactConsequence.objects.filter(platform=platform).update(
+            daily_gas_production=100,
+            gas_price=3,
+            discount_date_for_interrupted_production=5,
+            fraction_of_remaining_production_loss=50,
+            platform_replacement_cost=1000000,
+            platform_replacement_time=12,
+        )
+        Corrosion.objects.filter(platform=platform).update(
+            platform_design_life=50,
+            cp_design_life=25,
+            anode_survey_inspection_date=date(2015),
+            average_anode_depletion_from_survey=20,
+            average_anode_potential_from_survey=900,
+        )
+        DeckLoad.objects.filter(platform=platform).update(
+            original_topsides_design_load_known=True, increase_in_topsides_load=15
+        )
+        FatigueLoad.objects.filter(platform=platform).update(water_depth=40)
+        FloodedMember.objects.filter(platform=platform).update(
+            number_of_flooded_members_in_last_inspection=1,
+            flooded_members_last_inspection_date=date(2015),
+            previous_flooded_members_inspection_date=date(2010),
+            number_of_previous_inspection_flooded_members=0,
+        )
+        cls.platform_id = platform.pk
+
+    @staticmethod
+    def component_names():
+        fields = PlatformSerializer(context={"without_access": True}).fields
+        return {
+            name for name, field in fields.items() if isinstance(field, SerializerMethodField)
+        } | {"rsr_override_score"}
+
+    def components(self, platform):
+        data = PlatformSerializer(platform, context={"without_access": True}).data
+        return {name: data[name] for name in self.component_names()}
+
+    def inputs(self, platform):
+        """
+        ``(input name, object, field)`` for every field the serializer writes.
+        """
+        for field in Platform._meta.concrete_fields:
+            if field.name not in ("id", "project", "created_at", "updated_at", "version"):
+                yield field.attname if field.is_relation else field.name, platform, field
+
+        for name, child in [
+            *((name, getattr(platform, name)) for name in SCORING_RELATED_FIELDS),
+            ("marine_growths", platform.marine_growths.all()[0]),
+        ]:
+            for field in child._meta.concrete_fields:
+                if field.name not in ("id", "platform"):
+                    yield name, child, field
+
+    def test_changed_components_are_reported(self):
+        platform = Platform.objects.with_scoring_inputs().get(pk=self.platform_id)
+        baseline = self.components(platform)
+        changed_by = defaultdict(set)
+
+        for name, obj, field in self.inputs(platform):
+            original = getattr(obj, field.attname)
+            for value in input_values(field):
+                setattr(obj, field.attname, value)
+                components = self.components(platform)
+                setattr(obj, field.attname, original)
+
+                changed = {key for key, result in components.items() if result != baseline[key]}
+                changed_by[name].update(changed)
+                with self.subTest(input=f"{name}.{field.name}", value=value):
+                    self.assertLessEqual(changed, set(affected_score_components([name])))
+
+        mapped = set().union(*SCORE_COMPONENT_INPUTS.values(), {"reserve_strength_ratio_score"})
+        self.assertEqual(set(changed_by) - mapped - UNSCORED_INPUTS, set())
+        for name in mapped:
+            with self.subTest(input=name):
+                self.assertTrue(changed_by[name])
+
+    def test_unmapped_input_affects_everything(self):
+        self.assertEqual(set(affected_score_components(["unmapped"])), self.component_names())
+        self.assertEqual(affected_score_components(["name", "scope_of_survey"]), [])
+
+
+class InputSnapshotTest(TestCase):
+    fixtures = FIXTURES
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_text_columns_round_trip(self):
+        path = os.path.join(self.directory.name, "text.col")
+        values = ["", "Plataforma Ñandú ✓", None, "B-12"]
+        snapshot._write_table(path, {"name": ("name", "text")}, ({"name": value} for value in values))
+
+        table = ColumnarFile(path)
+        self.addCleanup(table.close)
+        self.assertNotIn("text", table.meta)
+        self.assertEqual(snapshot.InputSnapshot._decoded(table, "name"), values)
+
+    def test_platforms_round_trip(self):
+        project = Project.objects.create(name="project")
+        names = ["Plataforma Ñandú ✓", "B-12"]
+        for name in names:
+            Platform.objects.create(name=name, description=name.lower(), project=project)
+
+        inputs = snapshot.InputSnapshot(snapshot.write_snapshot(self.directory.name))
+        self.addCleanup(inputs.close)
+
+        self.assertEqual(inputs.column("name"), names)
+        self.assertEqual(
+            [platform.description for platform in inputs.platforms()],
+            [name.lower() for name in names],
+        )
+
+
+class RecordParserTest(SimpleTestCase):
+    def parse(self, body: bytes, max_record_size=None):
+        return list(iter_json_array(io.BytesIO(body), "utf-8", max_record_size))
+
+    def test_records(self):
+        self.assertEqual(self.parse(b' [ {"a": 1} , {"b": [2, "}"]}\n] \n'), [{"a": 1}, {"b": [2, "}"]}])
+
+    def test_empty_array(self):
+        self.assertEqual(self.parse(b"[]"), [])
+        self.assertEqual(self.parse(b" [ \n ] "), [])
+
+    def test_multibyte_characters_split_across_reads(self):
+        record = {"name": "plateforme \u00e9\u20ac\U0001f6e2"}
+        body = json.dumps([record] * 3, ensure_ascii=False).encode()
+        for size in (1, 2, 3):
+            with self.subTest(read_size=size), mock.patch.object(parsers, "READ_SIZE", size):
+                self.assertEqual(self.parse(body), [record] * 3)
+
+    def test_decoded_again_only_after_a_closing_brace(self):
+        body = json.dumps([{"name": "x" * 1000, "values": list(range(100))}]).encode()
+        with mock.patch.object(parsers, "READ_SIZE", 16), mock.patch.object(
+            parsers._decoder, "raw_decode", wraps=parsers._decoder.raw_decode
+        ) as raw_decode:
+            self.assertEqual(len(self.parse(body)), 1)
+        self.assertLessEqual(raw_decode.call_count, 2)
+
+    def test_errors(self):
+        for body, message in [
+            (b'[{"a": 1}] x', "unexpected data after the top level array"),
+            (b'[{"a": 1}][]', "unexpected data after the top level array"),
+            (b'{"a": 1}', "expected a top level array"),
+            (b"[1, 2]", "must be a JSON object"),
+            (b'[{"a": 1} {"b": 2}]', "expected ',' or ']'"),
+            (b'[{"a": }]', "JSON parse error"),
+            (b'[{"a": NaN}]', "NaN is not valid JSON"),
+            (b'[{"a": 1},', "unexpected end of data"),
+            (b'[{"a": "unterminated', "JSON parse error"),
+        ]:
+            with self.subTest(body=body), self.assertRaisesMessage(ParseError, message):
+                self.parse(body)
+
+    def test_oversize_record(self):
+        small = json.dumps({"a": "x" * 10}).encode()
+        large = json.dumps({"a": "x" * 200}).encode()
+        body = b"[" + b",".join([small, large]) + b"]"
+        with mock.patch.object(parsers, "READ_SIZE", 32):
+            records = iter_json_array(io.BytesIO(body), "utf-8", 100)
+            self.assertEqual(next(records), {"a": "x" * 10})
+            with self.assertRaisesMessage(ParseError, "record longer than 100 characters"):
+                next(records)
+
+    def test_ndjson(self):
+        body = b'{"a": 1}\r\n\n{"b": 2}\n'
+        self.assertEqual(list(iter_ndjson(io.BytesIO(body), "utf-8", 8)), [{"a": 1}, {"b": 2}])
+        with self.assertRaisesMessage(ParseError, "line 2 - longer than 8 bytes"):
+            list(iter_ndjson(io.BytesIO(b'{"a": 1}\n{"a": 12}\n'), "utf-8", 8))
+
+
+class MarineGrowthProfileTest(TestCase):
+    fixtures = FIXTURES
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username="admin", is_superuser=True)
+        cls.platform = Platform.objects.create(
+            name="platform", project=Project.objects.create(name="project")
+        )
+        cls.existing = MarineGrowth.objects.create(
+            platform=cls.platform,
+            marine_growth_depths_from_el=0,
+            marine_growth_depths_to_el=-10,
+            marine_growth_inspected_thickness=1,
+            marine_growth_design_thickness=1,
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = reverse("marine-growth-profile")
+
+    @staticmethod
+    def band(top, bottom, thickness=3, **fields):
+        return {
+            "marine_growth_depths_from_el": top,
+            "marine_growth_depths_to_el": bottom,
+            "marine_growth_inspected_thickness": thickness,
+            "marine_growth_design_thickness": 1,
+            **fields,
+        }
+
+    def post(self, body, **kwargs):
+        return self.client.post(self.url, body, **kwargs).json()
+
+    def depths(self):
+        return sorted(
+            MarineGrowth.objects.filter(platform=self.platform).values_list(
+                "marine_growth_depths_from_el", "marine_growth_inspected_thickness"
+            )
+        )
+
+    def test_replace_rescores_and_bumps_version_once(self):
+        version = Platform.objects.get(pk=self.platform.pk).version
+        response = self.post(
+            {"platform_id": self.platform.pk, "bands": [self.band(0, -5), self.band(-5, -10)]},
+            format="json",
+        )
+
+        self.assertTrue(response["status"])
+        self.assertEqual(len(response["marine_growths"]), 2)
+        self.assertEqual(len(response["marine_growth_each_elevation"]), 2)
+        self.assertEqual(self.depths(), [(-5, 3), (0, 3)])
+        self.assertEqual(Platform.objects.get(pk=self.platform.pk).version, version + 1)
+
+    def test_upsert(self):
+        response = self.post(
+            {
+                "platform_id": self.platform.pk,
+                "mode": "upsert",
+                "bands": [self.band(0, -10, 2, id=self.existing.pk), self.band(-10, -20)],
+            },
+            format="json",
+        )
+
+        self.assertTrue(response["status"])
+        self.assertEqual(self.depths(), [(-10, 3), (0, 2)])
+
+    def test_overlap_is_refused(self):
+        for mode, bands in [("replace", [self.band(0, -6), self.band(-5, -10)]), ("upsert", [self.band(-5, -15)])]:
+            with self.subTest(mode=mode):
+                response = self.post(
+                    {"platform_id": self.platform.pk, "mode": mode, "bands": bands}, format="json"
+                )
+                self.assertFalse(response["status"])
+                self.assertIn("overlaps", str(response["errors"]))
+                self.assertEqual(self.depths(), [(0, 1)])
+
+    def test_streamed_replace_rolls_back(self):
+        bands = [self.band(-i, -i - 1) for i in range(4)] + [self.band(-2, -3)]
+        body = "\n".join(json.dumps(band) for band in bands)
+        with mock.patch.object(views, "BULK_BATCH_SIZE", 2):
+            response = self.client.post(
+                f"{self.url}?platform_id={self.platform.pk}",
+                body,
+                content_type="application/x-ndjson",
+            ).json()
+
+        self.assertFalse(response["status"])
+        self.assertEqual(self.depths(), [(0, 1)])
+
+    def test_needs_modify_access(self):
+        self.client.force_authenticate(User.objects.create(username="viewer"))
+        response = self.post(
+            {"platform_id": self.platform.pk, "bands": [self.band(0, -5)]}, format="json"
+        )
+        self.assertFalse(response["status"])
+        self.assertEqual(self.depths(), [(0, 1)])
+
+
+class BulkSavePlatformTest(TestCase):
+    fixtures = FIXTURES
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username="creator")
+        cls.owner = User.objects.create(username="owner")
+        cls.outsider = User.objects.create(username="outsider")
+        cls.project = Project.objects.create(name="project")
+        cls.other_project = Project.objects.create(name="other")
+        ProjectOwnership.objects.create(
+            user=cls.user, project=cls.project, platform_create_access=True
+        )
+        ProjectOwnership.objects.create(user=cls.owner, project=cls.project)
+        ProjectOwnership.objects.create(user=cls.user, project=cls.other_project)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def record(self, i, **fields):
+        return {
+            "Name": f"platform {i}",
+            "Project": self.project.pk,
+            "Responsible": self.user.pk,
+            "corrosion": {"cp_design_life": 20},
+            **fields,
+        }
+
+    def post(self, records):
+        return self.client.post(reverse("platform-bulk-create"), records, format="json").json()
+
+    def test_creates_platforms_and_children(self):
+        response = self.post([self.record(0), self.record(1, Responsible=self.owner.pk)])
+        self.assertTrue(response["status"])
+
+        platforms = Platform.objects.filter(pk__in=response["platform_ids"]).order_by("pk")
+        self.assertEqual([platform.corrosion.cp_design_life for platform in platforms], [20, 20])
+        self.assertEqual(
+            [platform.users.get() for platform in platforms], [self.user, self.owner]
+        )
+
+    def test_errors_roll_back_every_batch(self):
+        records = [
+            self.record(0),
+            self.record(1),
+            self.record(2, corrosion={"cp_design_life": "long"}, bogus=1),
+        ]
+        with mock.patch.object(views, "BULK_BATCH_SIZE", 2):
+            response = self.post(records)
+
+        self.assertFalse(response["status"])
+        self.assertEqual(
+            response["errors"],
+            [
+                {
+                    "index": 2,
+                    "errors": {
+                        "bogus": ["Unknown field."],
+                        "corrosion": {"cp_design_life": ["A valid integer is required."]},
+                    },
+                }
+            ],
+        )
+        self.assertFalse(Platform.objects.exists())
+
+    def test_permissions(self):
+        response = self.post(
+            [
+                self.record(0, Project=self.other_project.pk),
+                self.record(1, Responsible=self.outsider.pk),
+                self.record(2, bracing_type_id=999),
+            ]
+        )
+
+        self.assertFalse(response["status"])
+        self.assertEqual(
+            response["errors"],
+            [
+                {"index": 0, "errors": {"Project": ["Unknown project or no platform create access."]}},
+                {"index": 1, "errors": {"Responsible": ["Must be you or an owner of the project."]}},
+                {"index": 2, "errors": {"bracing_type_id": ["Unknown id 999."]}},
+            ],
+        )
+        self.assertFalse(Platform.objects.exists())
+
+
+REPLICA = "test_replica"
+
+
+@override_settings(REPLICA_DATABASES=[REPLICA])
+class ReplicaRoutingTest(SimpleTestCase):
+    databases = {"default", REPLICA}
+
+    def request(self, method, **cookies):
+        """
+        :return: ``(aliases queried, response)``
+        """
+
+        def view(request):
+            list(Project.objects.all())
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)("/")
+        request.COOKIES.update(cookies)
+
+        queried = []
+        with CaptureQueriesContext(connections["default"]) as default:
+            with CaptureQueriesContext(connections[REPLICA]) as replica:
+                response = ReplicaRoutingMiddleware(view)(request)
+        if default.captured_queries:
+            queried.append("default")
+        if replica.captured_queries:
+            queried.append(REPLICA)
+        return queried, response
+
+    def test_get_reads_from_replica(self):
+        self.assertEqual(self.request("get")[0], [REPLICA])
+
+    def test_unsafe_methods_use_default_and_pin(self):
+        for method in ("post", "put", "patch", "delete"):
+            queried, response = self.request(method)
+            self.assertEqual(queried, ["default"])
+            self.assertIn(settings.REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_pin_cookie_forces_default(self):
+        pinned = {settings.REPLICA_PIN_COOKIE: str(time.time() + 60)}
+        self.assertEqual(self.request("get", **pinned)[0], ["default"])
+
+        expired = {settings.REPLICA_PIN_COOKIE: str(time.time() - 1)}
+        self.assertEqual(self.request("get", **expired)[0], [REPLICA])
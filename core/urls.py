@@ -11,14 +11,18 @@ from .views import (
     NumberOfLegsTypeViewSet,
     PlatformMannedStatusViewSet,
     MarineGrowthViewSet,
+    JobViewSet,
     UserList,
     CategoryList,
     SaveProject,
     SavePlatform,
+    BulkSavePlatform,
     SaveMarineGrowth,
+    SaveMarineGrowthProfile,
     DeleteProject,
     DeletePlatform,
     UpdatePlatform,
+    ImportInspections,
     UpdateProject,
     DeleteMarineGrowth
 )
@@ -32,6 +36,7 @@ router.register(r"bracing-types", BracingTypeViewSet, basename="bracing-type")
 router.register(r"number-of-legs-types", NumberOfLegsTypeViewSet, basename="number-of-legs-types")
 router.register(r"platform-manned-statuses",PlatformMannedStatusViewSet,basename="platform-manned-statuses",)
 router.register(r"marine-growths", MarineGrowthViewSet, basename="marine-growths")
+router.register(r"jobs", JobViewSet, basename="jobs")
 
 urlpatterns = [
     # fmt: off
@@ -40,12 +45,15 @@ urlpatterns = [
     path("category/", CategoryList.as_view(), name="category-list"),
     path("saveproject/", SaveProject.as_view(), name="project-list"),
     path("saveplatform/", SavePlatform.as_view(), name="platform-list"),
+    path("bulksaveplatform/", BulkSavePlatform.as_view(), name="platform-bulk-create"),
     path("savemarinegrowth/", SaveMarineGrowth.as_view(), name="marine-list"),
+    path("savemarinegrowthprofile/", SaveMarineGrowthProfile.as_view(), name="marine-growth-profile"),
     path("deletemarinegrowth/", DeleteMarineGrowth.as_view(), name="delete-marine-growth"),
     path("deleteproject/", DeleteProject.as_view(), name="project-delete"),
     path("deleteplatform/", DeletePlatform.as_view(), name="platform-delete"),
     path("updateproject/", UpdateProject.as_view(), name="project-update"),
     path("updateplatform/", UpdatePlatform.as_view(), name="platform-update"),
+    path("importinspections/", ImportInspections.as_view(), name="inspection-import"),
     path("", include(router.urls))
     # fmt: on
 ]
@@ -0,0 +1,101 @@
+"""
+Version stamps shared by every worker.
+
+A stamp is a ``time.time_ns()`` kept under a name in the ``RESULT_CACHE_ALIAS``
+cache. Whatever is cached under a stamp becomes unreachable once the stamp is
+bumped, on every worker.
+
+Reading the shared cache costs a query, so stamps read are also kept in the
+per-process ``PLATFORM_CACHE_ALIAS`` cache for ``VERSION_CACHE_TIMEOUT``
+seconds. A bump applies at once in the process making it, and within that
+time in the others.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError
+
+logger = logging.getLogger("core.versions")
+
+
+def _local_cache():
+    return caches[getattr(settings, "PLATFORM_CACHE_ALIAS", "platforms")]
+
+
+def _shared_cache():
+    # Without a shared cache versions are only bumped in this process
+    alias = getattr(settings, "RESULT_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def _key(name: str) -> str:
+    return f"version:{name}"
+
+
+def get_versions(names) -> dict:
+    """
+    The current ``{name: stamp}`` of ``names``, stamping those without one.
+
+    :raises DatabaseError: if the shared cache cannot be read
+    """
+    local = _local_cache()
+    shared = _shared_cache()
+    timeout = getattr(settings, "VERSION_CACHE_TIMEOUT", 5) if shared else None
+
+    keys = {_key(name): name for name in names}
+    found = local.get_many(keys)
+
+    missing = [key for key in keys if key not in found]
+    if missing:
+        store = shared or local
+        stamps = store.get_many(missing)
+        for key in missing:
+            if key not in stamps:
+                store.add(key, time.time_ns(), timeout=None)
+        stamps.update(store.get_many([key for key in missing if key not in stamps]))
+
+        if shared:
+            local.set_many(stamps, timeout=timeout)
+        found.update(stamps)
+
+    return {keys[key]: stamp for key, stamp in found.items()}
+
+
+def get_version(name: str):
+    return get_versions([name]).get(name)
+
+
+def bump_versions(names):
+    """
+    Stamp new versions for ``names``.
+    """
+    if not names:
+        return
+
+    stamps = {_key(name): time.time_ns() for name in names}
+    shared = _shared_cache()
+    try:
+        if shared:
+            shared.set_many(stamps, timeout=None)
+    except DatabaseError:
+        # Without a version store no request can trust its cached entries
+        logger.error("could not bump versions, clearing local cache", exc_info=True)
+        _local_cache().clear()
+        return
+
+    _local_cache().set_many(
+        stamps, timeout=getattr(settings, "VERSION_CACHE_TIMEOUT", 5) if shared else None
+    )
+
+
+def reference_version():
+    """
+    Version of the reference tables, which scores and payloads depend on.
+    """
+    return get_version("reference")
+
+
+def bump_reference_version():
+    bump_versions(["reference"])
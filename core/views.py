@@ -1,10 +1,25 @@
+import datetime
+import hashlib
+import io
+import json
 import logging
+import os
+import uuid
 from rest_framework.views import APIView
 
 from django_filters.rest_framework import DjangoFilterBackend, FilterSet
 from rest_framework import viewsets, mixins, filters, exceptions
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
-from django.http import JsonResponse
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from django.db import transaction
+from django.db.models import Count, Prefetch
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
 
 from .models import (
     User,
@@ -18,25 +33,82 @@ from .models import (
     MarineGrowth,
     ProjectOwnership,
     # SiteOwnership,
-    PlatformOwnership
+    PlatformOwnership,
+    EffectiveAccess,
+    PlatformScore,
+    Job,
+    CHILD_RELATED_FIELDS,
 )
+from .cache import (
+    PlatformPayloadCache,
+    PlatformSummaryCache,
+    render_payload,
+    with_access,
+)
+from .calculators import (
+    RISK_MATRIX,
+    PlatformSummaryCalculator,
+    MarineGrowthScoreCalculator,
+    MarineGrowthEachElevationCalculator,
+)
+from .fleet import get_fleet_scores
+from .inspections import import_inspections
+from .jobs import API_KINDS, USER_KINDS, enqueue, job_output_dir
+from .parsers import NDJSONRecordParser, JSONRecordsParser, RecordStream, batched
+from .prefetch import attach_prefetched, fetch_platforms
+from .registry import get_reference_data
+from .renderers import ColumnarJSONRenderer
+from .responses import precompile, precompiled_response
 from .serializers import (
     UserSerializer,
     ProjectSerializer,
     # SiteSerializer,
     PlatformSerializer,
+    BulkPlatformSerializer,
     PlatformTypeSerializer,
     BracingTypeSerializer,
     NumberOfLegsTypeSerializer,
     PlatformMannedStatusSerializer,
     MarineGrowthSerializer,
+    MarineGrowthProfileSerializer,
+    replace_marine_growth_profile,
     ProjectOwnershipSerializer,
     # SiteOwnershipSerializer,
-    PlatformOwnershipSerializer
+    PlatformOwnershipSerializer,
+    JobSerializer,
+    platform_access,
 )
+from .versions import reference_version
+from .visibility import VisibleIds, visible_ids
 
 logger = logging.getLogger("core.views")
 
+EXPORT_CHUNK_SIZE = 200
+
+BULK_BATCH_SIZE = 200
+
+# Reference ids a bulk platform record may carry, by child related name (None
+# for the platform itself) and field, looked up once per batch
+BULK_REFERENCE_FIELDS = {
+    (None, "platform_manned_status_id"): PlatformMannedStatus,
+    (None, "bracing_type_id"): BracingType,
+    (None, "number_of_legs_type_id"): NumberOfLegsType,
+    ("environmental_consequence", "platform_type_id"): PlatformType,
+}
+
+# Keys of a bulk platform record that are not platform fields
+BULK_RECORD_KEYS = {"StartDate", "Responsible"}
+
+# Related rows PlatformSerializer nests on top of the scoring inputs
+PAYLOAD_RELATED_FIELDS = (
+    "scope_of_survey",
+    "other_detail",
+    "environmental_consequence__platform_type",
+    "platform_manned_status",
+    "bracing_type",
+    "number_of_legs_type",
+)
+
 class UserList(APIView):
     def get(self,request):
         users = User.objects.all()
@@ -44,7 +116,7 @@ class UserList(APIView):
 
 class SaveProject(APIView):
     def get(self,request):
-        projects = Project.objects.all()
+        projects = project_list(Project.objects.has_ownership(request.user))
         p_serializers = ProjectSerializer(projects, many=True).data
         return Response(p_serializers)
     def post(self,request):
@@ -132,6 +204,167 @@ class SavePlatform(APIView):
         except:
             return Response({'status':False})
 
+class BulkSavePlatform(APIView):
+    """
+    Create many platforms at once. Takes a list, or ``{"platforms": [...]}``,
+    of ``SavePlatform`` bodies which may also carry platform fields and, under
+    a child's related name (e.g. ``"corrosion"``), the inputs of that child.
+    Large uploads can be streamed as NDJSON or ``JSONRecordsParser`` records
+    and are validated and saved ``BULK_BATCH_SIZE`` platforms at a time, see
+    ``validate_bulk_platforms``. Either every platform is created or none
+    is: the errors of the first batch with any are returned by record index.
+    """
+
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, NDJSONRecordParser, JSONRecordsParser]
+
+    def get(self, request):
+        return Response("Bulk save platforms")
+
+    def post(self, request):
+        try:
+            user = request.user
+            data = request.data
+            items = data.get("platforms") if isinstance(data, dict) else data
+            if not isinstance(items, (list, RecordStream)):
+                return Response({"status": False, "errors": {"platforms": ["Expected a list."]}})
+
+            platform_ids = []
+            with transaction.atomic():
+                for number, batch in enumerate(batched(items, BULK_BATCH_SIZE)):
+                    records, errors = validate_bulk_platforms(user, batch, number * BULK_BATCH_SIZE)
+                    if errors:
+                        transaction.set_rollback(True)
+                        return Response({"status": False, "errors": errors})
+
+                    platforms = []
+                    children = []
+                    for record in records:
+                        platforms.append(
+                            Platform(
+                                **{
+                                    key: value
+                                    for key, value in record.items()
+                                    if key not in BULK_RECORD_KEYS and key not in CHILD_RELATED_FIELDS
+                                }
+                            )
+                        )
+                        children.append({key: record[key] for key in CHILD_RELATED_FIELDS if key in record})
+
+                    platforms = Platform.objects.bulk_create_with_children(platforms, children)
+                    PlatformOwnership.objects.bulk_create(
+                        [
+                            PlatformOwnership(platform=platform, user_id=record["Responsible"], view_access=True)
+                            for platform, record in zip(platforms, records)
+                        ]
+                    )
+                    EffectiveAccess.objects.refresh([platform.id for platform in platforms])
+                    platform_ids.extend(platform.id for platform in platforms)
+
+            return Response({"platform_ids": platform_ids,
+                             "status": True})
+
+        except ParseError as exc:
+            return Response({"status": False, "errors": exc.detail})
+
+
+def validate_bulk_platforms(user, batch, offset: int):
+    """
+    Validate a batch of ``BulkSavePlatform`` records with
+    ``BulkPlatformSerializer``, then look up their projects, responsible users
+    and reference ids with one query per kind. Only the user's projects with
+    ``platform_create_access`` may be used, and only the user or an owner of
+    the project may be made responsible, unless the user is a superuser.
+
+    :param offset: index of the first record of the batch in the upload
+    :return: the validated records, and ``{"index": ..., "errors": {field:
+        [...]}}`` for each record with errors
+    """
+    records = []
+    errors = {}
+
+    def error(index, field, message, child=None):
+        fields = errors.setdefault(index, {})
+        if child is not None:
+            fields = fields.setdefault(child, {})
+        fields.setdefault(field, []).append(message)
+
+    for index, item in enumerate(batch, start=offset):
+        if not isinstance(item, dict):
+            error(index, api_settings.NON_FIELD_ERRORS_KEY, "Expected an object.")
+            continue
+
+        serializer = BulkPlatformSerializer(data=item)
+        for key in sorted(set(item) - set(serializer.fields)):
+            error(index, key, "Unknown field.")
+        for related_name in CHILD_RELATED_FIELDS:
+            inputs = item.get(related_name)
+            if isinstance(inputs, dict):
+                for key in sorted(set(inputs) - set(serializer.fields[related_name].fields)):
+                    error(index, key, "Unknown field.", related_name)
+
+        if serializer.is_valid():
+            records.append((index, serializer.validated_data))
+            continue
+        for field, detail in serializer.errors.items():
+            if isinstance(detail, dict):
+                errors.setdefault(index, {}).setdefault(field, {}).update(detail)
+            else:
+                errors.setdefault(index, {}).setdefault(field, []).extend(detail)
+
+    project_ids = {record["project_id"] for _, record in records}
+    responsible_ids = {record["Responsible"] for _, record in records}
+    project_owners = set()
+    if user.is_superuser:
+        projects = Project.objects.filter(pk__in=project_ids).values_list("pk", flat=True)
+    else:
+        projects = ProjectOwnership.objects.filter(
+            user=user, project_id__in=project_ids, platform_create_access=True
+        ).values_list("project_id", flat=True)
+        project_owners = set(
+            ProjectOwnership.objects.filter(
+                user_id__in=responsible_ids, project_id__in=project_ids
+            ).values_list("user_id", "project_id")
+        )
+    projects = set(projects)
+    users = set(User.objects.filter(pk__in=responsible_ids, is_active=True).values_list("pk", flat=True))
+
+    def reference_id(record, child, field):
+        if child is not None:
+            record = record.get(child) or {}
+        return record.get(field)
+
+    references = {
+        (child, field): set(
+            model.objects.filter(
+                pk__in={reference_id(record, child, field) for _, record in records}
+            ).values_list("pk", flat=True)
+        )
+        for (child, field), model in BULK_REFERENCE_FIELDS.items()
+    }
+
+    for index, record in records:
+        if record["project_id"] not in projects:
+            error(index, "Project", "Unknown project or no platform create access.")
+
+        responsible = record["Responsible"]
+        if responsible not in users:
+            error(index, "Responsible", "Unknown or inactive user.")
+        elif not (
+            user.is_superuser
+            or responsible == user.pk
+            or (responsible, record["project_id"]) in project_owners
+        ):
+            error(index, "Responsible", "Must be you or an owner of the project.")
+
+        for (child, field), ids in references.items():
+            value = reference_id(record, child, field)
+            if value is not None and value not in ids:
+                error(index, field, f"Unknown id {value}.", child)
+
+    return [record for _, record in records], [
+        {"index": index, "errors": errors[index]} for index in sorted(errors)
+    ]
+
 class SaveMarineGrowth(APIView):
     def get(self,request):
         return Response("save Marine growth")
@@ -179,6 +412,92 @@ class SaveMarineGrowth(APIView):
         except:
             return Response({"status":False})
 
+class SaveMarineGrowthProfile(APIView):
+    """
+    Replace or upsert the whole marine growth profile of a platform, see
+    ``MarineGrowthProfileSerializer``, and return it rescored.
+
+    Large profiles can be streamed as NDJSON or ``JSONRecordsParser`` band
+    records, with ``platform_id`` in the query string. They always replace
+    the profile and are saved ``BULK_BATCH_SIZE`` bands at a time.
+    """
+
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, NDJSONRecordParser, JSONRecordsParser]
+
+    def get(self, request):
+        return Response("Save marine growth profile")
+
+    def post(self, request):
+        try:
+            user = request.user
+            data = request.data
+            streamed = isinstance(data, RecordStream)
+            platform_id = request.query_params.get('platform_id') if streamed else data.get('platform_id')
+
+            if not user.is_superuser:
+                user_ownership = PlatformOwnership.objects.filter(user=user, platform_id=platform_id).first()
+                if not user_ownership or user_ownership.modify_access != True:
+                    return Response({"status": False})
+
+            platform = Platform.objects.get(id=platform_id)
+            if streamed:
+                count = replace_marine_growth_profile(platform, data, BULK_BATCH_SIZE)
+            else:
+                serializer = MarineGrowthProfileSerializer(data=data, context={"platform": platform})
+                if not serializer.is_valid():
+                    return Response({"status": False, "errors": serializer.errors})
+                marine_growths = serializer.save()
+
+            platform = Platform.objects.with_scoring_inputs().get(id=platform_id)
+            response = {
+                "status": True,
+                "marine_growths_score": MarineGrowthScoreCalculator(platform).calculate(),
+                "marine_growth_each_elevation": MarineGrowthEachElevationCalculator(platform)._calculate(),
+            }
+            if streamed:
+                response["count"] = count
+            else:
+                response["marine_growths"] = MarineGrowthSerializer(marine_growths, many=True).data
+            return Response(response)
+
+        except (ParseError, ValidationError) as exc:
+            return Response({"status": False, "errors": exc.detail})
+        except:
+            return Response({"status": False})
+
+class ImportInspections(APIView):
+    """
+    Upload a CSV of inspection results as ``file``, see ``core.inspections``.
+    Rows with errors are reported and skipped, the others are saved. With
+    ``?background=1`` the import is queued as a job and its id returned.
+    """
+
+    parser_classes = [MultiPartParser]
+
+    def get(self, request):
+        return Response("Import inspections")
+
+    def post(self, request):
+        try:
+            upload = request.FILES["file"]
+
+            if request.query_params.get("background"):
+                os.makedirs(job_output_dir(), exist_ok=True)
+                path = os.path.join(job_output_dir(), f"import-{uuid.uuid4().hex}.csv")
+                with open(path, "wb") as destination:
+                    for chunk in upload.chunks():
+                        destination.write(chunk)
+                job = enqueue("import_inspections", {"path": path}, user=request.user)
+                return Response({"status": True, "job_id": job.pk})
+
+            file = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+            result = import_inspections(file, user=request.user)
+            return Response({"status": True,
+                             "updated": result.updated,
+                             "errors": result.errors})
+        except:
+            return Response({"status": False})
+
 class DeleteMarineGrowth(APIView):
     def post(self, request):
         try:
@@ -335,10 +654,11 @@ class UpdatePlatform(APIView):
         except:
             return Response({"status":False})
 
+CATEGORIES = precompile(['A','B','C','D','E'])
+
 class CategoryList(APIView):
     def get(self,request):
-        categories = ['A','B','C','D','E']
-        return Response(categories)
+        return precompiled_response(request, CATEGORIES)
 
 
 class UserViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin):
@@ -358,9 +678,50 @@ class UserViewSet(viewsets.GenericViewSet, mixins.RetrieveModelMixin):
         return super().retrieve(request, *args, **kwargs)
 
 
+# VisibleIds attribute listing the visible ids of the models looked up
+# one at a time by primary key
+VISIBLE_ID_LOOKUPS = {
+    Platform: "platforms",
+    Project: "projects",
+}
+
+
 class OwnedResourceFilter(filters.BaseFilterBackend):
+    """
+    Narrows to the rows the user can see. Lists are filtered in SQL with the
+    models' ``has_ownership`` subquery, single platforms and projects are
+    checked in memory against the user's cached visible ids.
+    """
+
     def filter_queryset(self, request, queryset, view):
-        return queryset.has_ownership(request.user)
+        kind = VISIBLE_ID_LOOKUPS.get(queryset.model)
+        pk = view.kwargs.get(view.lookup_url_kwarg or view.lookup_field)
+        if kind is None or pk is None or request.user.is_superuser:
+            return queryset.has_ownership(request.user)
+
+        ids = getattr(visible_ids(request.user), kind)
+        return queryset.filter(pk=pk) if VisibleIds.contains(ids, pk) else queryset.none()
+
+
+def project_list(queryset):
+    """
+    Projects of ``queryset`` with their platform stats and their owners, in
+    two queries however many projects there are.
+    """
+    projects = list(queryset.with_platform_stats().order_by("pk"))
+    ownerships = (
+        ProjectOwnership.objects.filter(project__in=queryset.values("pk"))
+        .select_related("user")
+        .order_by("pk")
+    )
+
+    by_project = {}
+    for ownership in ownerships:
+        by_project.setdefault(ownership.project_id, []).append(ownership)
+    for project in projects:
+        attach_prefetched(project, "project_name", by_project.get(project.pk, []))
+
+    return projects
 
 
 class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
@@ -368,6 +729,18 @@ class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Project.objects.all()
     filter_backends = [OwnedResourceFilter, DjangoFilterBackend]
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "retrieve":
+            queryset = queryset.with_platform_stats().prefetch_related(
+                Prefetch("project_name", queryset=ProjectOwnership.objects.select_related("user"))
+            )
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        projects = project_list(self.filter_queryset(self.get_queryset()))
+        return Response(self.get_serializer(projects, many=True).data)
+
 
 # class SiteViewSet(viewsets.ReadOnlyModelViewSet):
 #     serializer_class = SiteSerializer
@@ -376,10 +749,76 @@ class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
 #     filterset_fields = ["project"]
 
 
+def platform_etag(request, versions):
+    """
+    Strong ETag for a platform payload, built from ``(pk, updated_at,
+    version)`` rows. The payload also depends on who asks and in which
+    format, its inspection plans on the current year and its scores on the
+    reference data, so these are part of the tag as well.
+    """
+    digest = hashlib.sha1()
+    digest.update(
+        f"{request.user.pk}:{request.user.is_superuser}:"
+        f"{request.accepted_renderer.format}:{datetime.date.today().year}:"
+        f"{reference_version()}".encode()
+    )
+    for pk, updated_at, version in versions:
+        digest.update(f"|{pk}:{updated_at.isoformat()}:{version}".encode())
+    return quote_etag(digest.hexdigest())
+
+
+def conditional_response(request, etag, get_response):
+    """
+    Answer ``If-None-Match`` with 304 before ``get_response`` runs any
+    calculator, otherwise tag the fresh response.
+    """
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    response = get_response()
+    response["ETag"] = etag
+    patch_vary_headers(response, ("Authorization",))
+    return response
+
+
+def platform_summaries(rows):
+    """
+    ``PlatformSummaryCalculator`` rows of the platforms of ``rows``, answered
+    from the fleet score file and the summary cache where possible. Only the
+    rest is loaded and scored.
+
+    :param rows: ``(pk, updated_at, version, name, project_id)`` tuples
+    :return: ``{pk: summary}``
+    """
+    versions = [(pk, updated_at, version) for pk, updated_at, version, _, _ in rows]
+
+    fleet_scores = get_fleet_scores()
+    summaries = fleet_scores.summaries(rows) if fleet_scores else {}
+
+    summary_cache = PlatformSummaryCache()
+    summaries.update(
+        summary_cache.get_many(
+            [row for row in versions if row[0] not in summaries]
+        )
+    )
+
+    missing = [pk for pk, _, _ in versions if pk not in summaries]
+    if missing:
+        computed = {
+            (platform.pk, platform.updated_at, platform.version): PlatformSummaryCalculator(platform)._calculate()
+            for platform in fetch_platforms(missing)
+        }
+        summaries.update((row[0], summary) for row, summary in computed.items())
+        summary_cache.set_many(computed)
+
+    return summaries
+
+
 class PlatformFilter(FilterSet):
     class Meta:
         model = Platform
-        fields = ["name", "project__name"]
+        fields = ["name", "project", "project__name", "field_name"]
 
 class PlatformViewSet(
     viewsets.GenericViewSet,
@@ -390,8 +829,74 @@ class PlatformViewSet(
     serializer_class = PlatformSerializer
     queryset = Platform.objects.all()
     filter_backends = [OwnedResourceFilter, DjangoFilterBackend]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
     filterset_class = PlatformFilter
 
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        versions = list(
+            queryset.order_by("pk").values_list("pk", "updated_at", "version")
+        )
+
+        def get_response():
+            if request.accepted_renderer.format != "json":
+                return super(PlatformViewSet, self).list(request, *args, **kwargs)
+
+            payloads = self.rendered_payloads(versions)
+            return HttpResponse(
+                b"[" + b",".join(payloads) + b"]", content_type="application/json"
+            )
+
+        return conditional_response(request, platform_etag(request, versions), get_response)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        versions = [(instance.pk, instance.updated_at, instance.version)]
+
+        def get_response():
+            if request.accepted_renderer.format != "json":
+                return Response(self.get_serializer(instance).data)
+
+            payload, = self.rendered_payloads(versions)
+            return HttpResponse(payload, content_type="application/json")
+
+        return conditional_response(request, platform_etag(request, versions), get_response)
+
+    def rendered_payloads(self, versions):
+        """
+        JSON bytes for each ``(pk, updated_at, version)`` row, served from the
+        payload cache where possible. Only the misses are loaded and scored.
+        """
+        payload_cache = PlatformPayloadCache()
+        payloads = payload_cache.get_many(versions)
+
+        missing = [pk for pk, _, _ in versions if pk not in payloads]
+        if missing:
+            # Access is spliced in per request, so the payload leaves it out
+            context = {**self.get_serializer_context(), "without_access": True}
+            rendered = {
+                (platform.pk, platform.updated_at, platform.version): render_payload(
+                    PlatformSerializer(platform, context=context).data
+                )
+                for platform in fetch_platforms(missing, related=PAYLOAD_RELATED_FIELDS)
+            }
+            payloads.update((row[0], payload) for row, payload in rendered.items())
+            payload_cache.set_many(rendered)
+
+        access = platform_access(self.request.user, [pk for pk, _, _ in versions])
+        return [
+            with_access(payloads[pk], *access[pk])
+            for pk, _, _ in versions
+            if pk in payloads
+        ]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("update", "partial_update"):
+            # Updates compare every child block against its current values
+            queryset = queryset.select_related(*CHILD_RELATED_FIELDS)
+        return queryset
+
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop("partial", False)
         instance: Platform = self.get_object()
@@ -416,27 +921,257 @@ class PlatformViewSet(
             # forcibly invalidate the prefetch cache on the instance.
             instance._prefetched_objects_cache = {}
 
-        return Response(serializer.data)
+        return Response(
+            {**serializer.data, "affected_score_components": serializer.affected_score_components}
+        )
+
+    @action(detail=False)
+    def summary(self, request, *args, **kwargs):
+        """
+        Lean risk overview of every visible platform for dashboards, optionally
+        filtered on risk_ranking, lof_ranking or final_consequence_category.
+        Platforms unchanged since the last fleet score refresh are answered
+        from the shared score file.
+
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = list(
+            queryset.order_by("pk").values_list(
+                "pk", "updated_at", "version", "name", "project_id"
+            )
+        )
+        summaries = platform_summaries(rows)
+        results = [summaries[row[0]] for row in rows if row[0] in summaries]
+
+        for field in ("risk_ranking", "lof_ranking", "final_consequence_category"):
+            value = request.query_params.get(field)
+            if value is not None:
+                results = [row for row in results if str(row[field]) == value]
+
+        return Response(results)
+
+    @action(detail=False, url_path="risk-matrix")
+    def risk_matrix(self, request, *args, **kwargs):
+        """
+        Visible platforms (filterable on project and field_name) counted per
+        cell of the lof ranking x final consequence category risk matrix,
+        grouped in SQL over the fresh stored scores. Platforms without one
+        are unrated until ``manage.py recompute_scores`` scores them.
+
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        scores = PlatformScore.objects.fresh().filter(
+            platform__in=queryset.values("pk"),
+            final_consequence_category__in=list(RISK_MATRIX),
+            lof_ranking__in=list(RISK_MATRIX["A"]),
+        )
+
+        counts = {
+            (row["final_consequence_category"], row["lof_ranking"]): row["count"]
+            for row in scores.order_by()
+            .values("final_consequence_category", "lof_ranking")
+            .annotate(count=Count("pk"))
+        }
+        platform_ids = {}
+        for category, lof_ranking, pk in scores.order_by(
+            "final_consequence_category", "lof_ranking", "platform_id"
+        ).values_list("final_consequence_category", "lof_ranking", "platform_id"):
+            platform_ids.setdefault((category, lof_ranking), []).append(pk)
+
+        unrated = list(
+            queryset.exclude(pk__in=scores.values("platform_id"))
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+        return Response(
+            {
+                "cells": [
+                    {
+                        "final_consequence_category": category,
+                        "lof_ranking": lof_ranking,
+                        "risk_ranking": RISK_MATRIX[category][lof_ranking],
+                        "count": counts.get((category, lof_ranking), 0),
+                        "platform_ids": platform_ids.get((category, lof_ranking), []),
+                    }
+                    for category in RISK_MATRIX
+                    for lof_ranking in RISK_MATRIX[category]
+                ],
+                "unrated": unrated,
+                "count": sum(counts.values()) + len(unrated),
+            }
+        )
+
+    @action(detail=False)
+    def export(self, request, *args, **kwargs):
+        """
+        Stream every visible platform with its inputs and scores as
+        newline-delimited JSON
+
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .with_scoring_inputs()
+            .select_related(*PAYLOAD_RELATED_FIELDS)
+        )
+
+        def rows():
+            for platform in queryset.chunked(EXPORT_CHUNK_SIZE):
+                data = self.get_serializer(platform).data
+                yield json.dumps(data, cls=JSONEncoder) + "\n"
+
+        response = StreamingHttpResponse(rows(), content_type="application/x-ndjson")
+        response["Content-Disposition"] = 'attachment; filename="platforms.ndjson"'
+        return response
+
+
+# Job kinds whose result is a file under JOB_OUTPUT_DIR, with its content type
+DOWNLOAD_KINDS = {"export_platforms": "application/x-ndjson"}
+
+
+class JobViewSet(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.RetrieveModelMixin):
+    """
+    Background jobs of the user, to poll for progress and results. POST
+    ``{"kind": ..., "payload": {...}}`` queues a new one.
+    """
+
+    serializer_class = JobSerializer
+    queryset = Job.objects.order_by("-pk")
+    filter_backends = [OwnedResourceFilter, DjangoFilterBackend]
+    filterset_fields = ["kind", "status"]
+
+    def create(self, request, *args, **kwargs):
+        kind = request.data.get("kind")
+        if kind not in API_KINDS:
+            raise exceptions.ValidationError({"kind": [f"Must be one of {sorted(API_KINDS)}."]})
+        if kind not in USER_KINDS and not request.user.is_superuser:
+            raise exceptions.PermissionDenied()
+
+        payload = request.data.get("payload") or {}
+        if not isinstance(payload, dict):
+            raise exceptions.ValidationError({"payload": ["Must be an object."]})
+
+        job = enqueue(kind, payload, user=request.user)
+        return Response(self.get_serializer(job).data, status=202)
+
+    @action(detail=True)
+    def download(self, request, *args, **kwargs):
+        """
+        Stream the file a finished export wrote. Only the user who queued
+        the job may fetch it.
+
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        job: Job = self.get_object()
+        if job.created_by_id != request.user.pk:
+            raise exceptions.NotFound()
+        if job.kind not in DOWNLOAD_KINDS or job.status != Job.DONE:
+            raise exceptions.NotFound("This job has no file to download.")
+
+        path = os.path.realpath(job.result_data["path"])
+        if os.path.dirname(path) != os.path.realpath(job_output_dir()) or not os.path.exists(path):
+            raise exceptions.NotFound("The file of this job is gone.")
+
+        return FileResponse(
+            open(path, "rb"),
+            as_attachment=True,
+            filename=os.path.basename(path),
+            content_type=DOWNLOAD_KINDS[job.kind],
+        )
+
+
+class ReferenceDataViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Serves a reference table from the in-process registry instead of the
+    database, as bytes rendered once per registry snapshot.
+    ``reference_name`` is the registry table to read.
+    """
+
+    reference_name: str
+
+    # (snapshot, rendered list, rendered items by pk) for the current snapshot
+    _precompiled = None
+
+    def precompiled(self):
+        reference_data = get_reference_data()
+        cached = type(self)._precompiled
+
+        if cached is None or cached[0] is not reference_data:
+            rows = getattr(reference_data, self.reference_name).values()
+            data = self.get_serializer(rows, many=True).data
+            cached = (
+                reference_data,
+                precompile(data),
+                {item["id"]: precompile(item) for item in data},
+            )
+            type(self)._precompiled = cached
+
+        return cached
+
+    def list(self, request, *args, **kwargs):
+        _, rendered_list, _ = self.precompiled()
+        return precompiled_response(request, rendered_list)
+
+    def retrieve(self, request, *args, **kwargs):
+        obj = self.get_object()
+        _, _, rendered_items = self.precompiled()
+        return precompiled_response(request, rendered_items[obj.pk])
+
+    def get_queryset(self):
+        return list(getattr(get_reference_data(), self.reference_name).values())
+
+    def get_object(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            pk = int(self.kwargs[lookup_url_kwarg])
+        except ValueError:
+            raise exceptions.NotFound()
+
+        obj = getattr(get_reference_data(), self.reference_name).get(pk)
+        if obj is None:
+            raise exceptions.NotFound()
+
+        self.check_object_permissions(self.request, obj)
+        return obj
 
 
-class PlatformTypeViewSet(viewsets.ReadOnlyModelViewSet):
+class PlatformTypeViewSet(ReferenceDataViewSet):
     serializer_class = PlatformTypeSerializer
     queryset = PlatformType.objects.all()
+    reference_name = "platform_types"
 
 
-class BracingTypeViewSet(viewsets.ReadOnlyModelViewSet):
+class BracingTypeViewSet(ReferenceDataViewSet):
     serializer_class = BracingTypeSerializer
     queryset = BracingType.objects.all()
+    reference_name = "bracing_types"
 
 
-class NumberOfLegsTypeViewSet(viewsets.ReadOnlyModelViewSet):
+class NumberOfLegsTypeViewSet(ReferenceDataViewSet):
     serializer_class = NumberOfLegsTypeSerializer
     queryset = NumberOfLegsType.objects.all()
+    reference_name = "number_of_legs_types"
 
 
-class PlatformMannedStatusViewSet(viewsets.ReadOnlyModelViewSet):
+class PlatformMannedStatusViewSet(ReferenceDataViewSet):
     serializer_class = PlatformMannedStatusSerializer
     queryset = PlatformMannedStatus.objects.all()
+    reference_name = "platform_manned_statuses"
 
 
 class MarineGrowthFilter(FilterSet):
@@ -449,4 +1184,5 @@ class MarineGrowthViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, OwnedResourceFilter]
     serializer_class = MarineGrowthSerializer
     queryset = MarineGrowth.objects.all()
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
     filterset_class = MarineGrowthFilter
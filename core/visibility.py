@@ -0,0 +1,111 @@
+"""
+Per-user cache of the platforms and projects a user can see.
+
+The ids are cached in the per-process ``PLATFORM_CACHE_ALIAS`` cache, keyed by
+the user's access version, see ``core.versions``.
+``EffectiveAccess.objects.refresh`` sends ``access_changed`` for the users it
+touched, which stamps a new version, so stale id sets are never read again and
+simply age out.
+
+Users also have an auth version, which keys the users cached by
+``core.authentication``.
+"""
+import bisect
+import logging
+from array import array
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError
+
+from .models import EffectiveAccess, ProjectOwnership
+from .versions import bump_versions, get_versions
+
+logger = logging.getLogger("core.visibility")
+
+
+def _local_cache():
+    return caches[getattr(settings, "PLATFORM_CACHE_ALIAS", "platforms")]
+
+
+def bump_access_versions(user_ids):
+    """
+    Make the cached ids of ``user_ids`` unreachable.
+    """
+    bump_versions([f"access:{user_id}" for user_id in user_ids])
+
+
+def bump_auth_versions(user_ids):
+    """
+    Make the cached users of ``user_ids`` unreachable. Saving or deleting a
+    user does this already; call it after changing users with
+    ``QuerySet.update`` or raw SQL, which send no signals.
+    """
+    bump_versions([f"auth:{user_id}" for user_id in user_ids])
+
+
+def user_versions(user_id, kinds=("auth", "access")) -> dict:
+    """
+    The current ``{kind: version}`` of ``user_id``.
+    """
+    versions = get_versions([f"{kind}:{user_id}" for kind in kinds])
+    return {name.split(":")[0]: version for name, version in versions.items()}
+
+
+def access_version(user_id):
+    return user_versions(user_id, kinds=("access",)).get("access")
+
+
+class VisibleIds:
+    """
+    Sorted ids of the platforms and projects a user can see.
+    """
+
+    def __init__(self, platforms: array, projects: array):
+        self.platforms = platforms
+        self.projects = projects
+
+    @staticmethod
+    def contains(ids: array, pk) -> bool:
+        try:
+            pk = int(pk)
+        except (TypeError, ValueError):
+            return False
+
+        i = bisect.bisect_left(ids, pk)
+        return i < len(ids) and ids[i] == pk
+
+
+def visible_ids(user) -> VisibleIds:
+    """
+    Ids visible to ``user`` (not a superuser), loaded on a cache miss with
+    one indexed query per table.
+    """
+    try:
+        # Read along with the auth version by CachedJWTAuthentication
+        version = getattr(user, "access_version", None) or access_version(user.pk)
+    except DatabaseError:
+        logger.warning("access versions unavailable", exc_info=True)
+        version = None
+
+    key = f"visible-ids:{user.pk}:{version}"
+    visible = _local_cache().get(key) if version is not None else None
+    if visible is None:
+        visible = VisibleIds(
+            array(
+                "q",
+                EffectiveAccess.objects.filter(user=user)
+                .order_by("platform_id")
+                .values_list("platform_id", flat=True),
+            ),
+            array(
+                "q",
+                ProjectOwnership.objects.filter(user=user)
+                .order_by("project_id")
+                .values_list("project_id", flat=True),
+            ),
+        )
+        if version is not None:
+            _local_cache().set(key, visible)
+
+    return visible